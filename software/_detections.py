@@ -0,0 +1,134 @@
+"""
+Detection post-processing for object_detection.py.
+
+Fully type-annotated so it can be compiled with mypyc:
+    mypyc _detections.py
+The compiled extension is imported in place of this file automatically;
+without it, this file runs as plain Python.
+"""
+
+import functools
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Detection:
+    """
+    One detected object.
+    Plain class with __slots__ rather than @dataclass(slots=True), which
+    needs Python 3.10 (the Pi's TFLite stack may pin 3.9, see project.md).
+
+    Attributes:
+        cls: Normalized class label (e.g. "person", "stop sign")
+        confidence: Detection score (0-1)
+        bbox: (x, y, width, height) in frame pixels
+        class_id: COCO class id when the backend provides a trusted one
+        note: Backend-specific remark (e.g. vilib's "face_detection")
+    """
+    __slots__ = ('cls', 'confidence', 'bbox', 'class_id', 'note')
+
+    cls: str
+    confidence: float
+    bbox: Tuple[int, int, int, int]
+    class_id: Optional[int]
+    note: str
+
+    def __init__(self, cls: str, confidence: float, bbox: Tuple[int, int, int, int],
+                 class_id: Optional[int] = None, note: str = '') -> None:
+        self.cls = cls
+        self.confidence = confidence
+        self.bbox = bbox
+        self.class_id = class_id
+        self.note = note
+
+    def __repr__(self) -> str:
+        return (f"Detection(cls={self.cls!r}, confidence={self.confidence!r}, "
+                f"bbox={self.bbox!r}, class_id={self.class_id!r}, note={self.note!r})")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Detection):
+            return NotImplemented
+        return ((self.cls, self.confidence, self.bbox, self.class_id, self.note) ==
+                (other.cls, other.confidence, other.bbox, other.class_id, other.note))
+
+    def __getitem__(self, key: str) -> Any:
+        """Dict-style access (det['class'], det['bbox'], ...) for older callers"""
+        if key == 'class':
+            return self.cls
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict.get equivalent of __getitem__"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+@functools.lru_cache(maxsize=128)
+def normalize_label(label: Optional[str]) -> str:
+    """
+    Normalize object detection labels.
+    Handles variations like "stop sign" vs "stop_sign", case differences, etc.
+    Cached, since detectors only ever emit a small fixed set of labels.
+
+    Args:
+        label: Raw label string
+
+    Returns:
+        Normalized lowercase label with spaces
+    """
+    if not label:
+        return ""
+    # Convert to lowercase, replace underscores with spaces, strip
+    normalized = label.lower().replace("_", " ").strip()
+    return normalized
+
+
+def build_detection(label: str, class_id: Optional[int], score: float,
+                    x: int, y: int, w: int, h: int) -> Detection:
+    """Build one Detection (bbox is (x, y, width, height))"""
+    return Detection(label, score, (x, y, w, h), class_id)
+
+
+def convert_detections(raw: Any, sx: float, sy: float,
+                       label_ids: Dict[str, int]) -> List[Detection]:
+    """
+    Convert MediaPipe detections to Detection objects.
+
+    Args:
+        raw: detection_result.detections from MediaPipe
+        sx, sy: Scale from inference image to reported bbox coordinates
+        label_ids: Label -> class id map; the model's category.index is only
+                   kept when it agrees with this map
+
+    Returns:
+        List of Detection objects with normalized labels
+    """
+    scaled = sx != 1.0 or sy != 1.0
+    detections: List[Detection] = []
+    for detection in raw:
+        bbox = detection.bounding_box
+        category = detection.categories[0]
+
+        # Normalize label (handles "stop sign" vs "stop_sign", etc.)
+        label = normalize_label(category.category_name)
+
+        class_id: Optional[int] = category.index
+        if label_ids.get(label) != class_id:
+            class_id = None
+
+        x: int = bbox.origin_x
+        y: int = bbox.origin_y
+        w: int = bbox.width
+        h: int = bbox.height
+        if scaled:
+            x = int(x * sx)
+            y = int(y * sy)
+            w = int(w * sx)
+            h = int(h * sy)
+
+        detections.append(build_detection(label, class_id, category.score, x, y, w, h))
+    return detections
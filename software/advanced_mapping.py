@@ -1,6 +1,10 @@
 """
 Part 2, Step 6: Advanced Mapping
-Implements non-probabilistic mapping using ultrasonic sensor scanning.
+Implements occupancy-grid mapping using ultrasonic sensor scanning.
+
+Each cell accumulates integer log-odds evidence (rays passing through count
+towards free, ray endpoints towards occupied), and the 3-state map is derived
+from it, so a single stray reading no longer permanently overwrites a cell.
 
 Requirements:
 - Create 100x100 numpy array (1cm per cell) representing environment
@@ -12,10 +16,30 @@ Requirements:
 """
 
 import numpy as np
-import math
 import time
 from hardware_mock import get_hardware
 
+# Try to import Numba (JIT-compiles the ray kernels; they run as plain Python without it)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Try to import the ahead-of-time compiled kernels (built by build_kernels.py)
+try:
+    from mapping_kernels import bresenham_mark_free, rasterize_scan
+    AOT_KERNELS_AVAILABLE = True
+except ImportError:
+    AOT_KERNELS_AVAILABLE = False
+
 # Configuration
 MAP_SIZE = 100  # 100x100 grid (1cm per cell = 100cm x 100cm)
 MAP_CENTER = MAP_SIZE // 2  # Car starts at center (50, 50)
@@ -31,6 +55,253 @@ UNKNOWN = -1  # Not yet observed
 FREE = 0      # Observed and free
 OCCUPIED = 1  # Observed and occupied (obstacle)
 
+# Trig lookup tables at 1° resolution (scan angles and headings are whole degrees)
+# float64 keeps rounding identical to math.cos/math.sin (e.g. sin 30° stays just below 0.5)
+_COS = np.cos(np.deg2rad(np.arange(360, dtype=np.float64)))
+_SIN = np.sin(np.deg2rad(np.arange(360, dtype=np.float64)))
+
+# Log-odds evidence per cell (integer units, stored as int16)
+L_OCC = 8     # Added each time a ray ends in the cell (obstacle hit)
+L_FREE = 2    # Subtracted each time a ray passes through the cell
+L_MIN = -40   # Evidence is clamped so old observations can still be overturned
+L_MAX = 40
+L_THRESH = 0  # Log-odds above +L_THRESH = occupied, below -L_THRESH = free, else unknown
+
+# ASCII glyph per occupancy state, indexed by state + 1 (unknown, free, occupied)
+_GLYPHS = np.array([b'?', b'.', b'1'], dtype='S1')
+
+@njit(cache=True, nogil=True)
+def _bresenham_trace(x1, y1, x2, y2, xs, ys):
+    """
+    Write the cells from (x1, y1) up to (but not including) (x2, y2) into xs, ys.
+    Uses Bresenham's line algorithm.
+    
+    Args:
+        x1, y1: Start point (car position)
+        x2, y2: End point (obstacle position - this cell is NOT included)
+        xs, ys: Output arrays with room for max(|x2 - x1|, |y2 - y1|) cells
+    
+    Returns:
+        Number of cells written
+    """
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx - dy
+    
+    x, y = x1, y1
+    n = 0
+    
+    while not (x == x2 and y == y2):
+        xs[n] = x
+        ys[n] = y
+        n += 1
+        
+        e2 = 2 * err
+        if e2 > -dy:
+            err -= dy
+            x += sx
+        if e2 < dx:
+            err += dx
+            y += sy
+    return n
+
+
+@njit(cache=True, nogil=True)
+def _add_free_evidence(logodds, xs, ys, count):
+    """Subtract L_FREE (clamped at L_MIN) from the first count cells listed in xs, ys."""
+    height, width = logodds.shape
+    for k in range(count):
+        x = xs[k]
+        y = ys[k]
+        if 0 <= x < width and 0 <= y < height:
+            v = logodds[y, x] - L_FREE
+            logodds[y, x] = v if v > L_MIN else L_MIN
+
+
+@njit(cache=True, nogil=True)
+def _bresenham_mark_free(logodds, x1, y1, x2, y2):
+    """
+    Add free-space evidence to cells from (x1, y1) up to (but not including) (x2, y2).
+    Uses Bresenham's line algorithm.
+    
+    Args:
+        logodds: 2D log-odds grid (indexed [y, x]), modified in place
+        x1, y1: Start point (car position)
+        x2, y2: End point (obstacle position - this cell is NOT marked as free)
+    """
+    n = max(abs(x2 - x1), abs(y2 - y1))
+    xs = np.empty(n, dtype=np.int64)
+    ys = np.empty(n, dtype=np.int64)
+    count = _bresenham_trace(x1, y1, x2, y2, xs, ys)
+    _add_free_evidence(logodds, xs, ys, count)
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _rasterize_scan(logodds, cos_t, sin_t, dists, car_x, car_y, max_d, obs_thresh):
+    """
+    Add a whole scan to logodds: free evidence along each ray, occupied at each hit.
+    
+    Rays are traced in parallel into per-ray cell lists, then the evidence is
+    applied serially: rays overlap near the car, and concurrent read-modify-write
+    updates of a shared cell would lose counts. Runs without the GIL, so other
+    Python threads (e.g. object detection) keep running meanwhile.
+    
+    Args:
+        logodds: 2D log-odds grid (indexed [y, x]), modified in place
+        cos_t, sin_t: 1D arrays with each ray's direction in map coordinates
+        dists: 1D array of distances in centimeters
+        car_x, car_y: Car position in map cells
+        max_d: Readings at or beyond this distance are ignored
+        obs_thresh: Readings beyond this distance are ignored
+    """
+    height, width = logodds.shape
+    n = dists.size
+    if n == 0:
+        return
+    hit_x = np.full(n, -1, dtype=np.int64)
+    hit_y = np.full(n, -1, dtype=np.int64)
+    ray_len = np.zeros(n, dtype=np.int64)
+    
+    for i in prange(n):
+        d = dists[i]
+        # Gate obstacle marking: only mark if distance is within threshold
+        if d <= 0 or d >= max_d or d > obs_thresh:
+            continue
+        
+        x = round(car_x + d * cos_t[i])
+        y = round(car_y + d * sin_t[i])
+        if 0 <= x < width and 0 <= y < height:
+            hit_x[i] = x
+            hit_y[i] = y
+            ray_len[i] = max(abs(x - car_x), abs(y - car_y))
+    
+    # One cell list per ray, so tracing needs no shared writes
+    ray_x = np.empty((n, ray_len.max()), dtype=np.int64)
+    ray_y = np.empty((n, ray_len.max()), dtype=np.int64)
+    for i in prange(n):
+        if hit_x[i] >= 0:
+            _bresenham_trace(car_x, car_y, hit_x[i], hit_y[i], ray_x[i], ray_y[i])
+    
+    for i in range(n):
+        _add_free_evidence(logodds, ray_x[i], ray_y[i], ray_len[i])
+    
+    for i in range(n):
+        x = hit_x[i]
+        y = hit_y[i]
+        if x >= 0:
+            v = logodds[y, x] + L_OCC
+            logodds[y, x] = v if v < L_MAX else L_MAX
+
+
+def _dda_trace(x1, y1, x2, y2):
+    """
+    NumPy DDA version of _bresenham_trace (used when Numba is unavailable).
+    
+    Steps one cell at a time along the major axis and rounds the minor axis
+    half-down, which visits exactly the cells the Bresenham kernel does, but
+    without an interpreted loop.
+    
+    Returns:
+        (xs, ys) arrays of the cells from (x1, y1) up to (but not including) (x2, y2)
+    """
+    dx = x2 - x1
+    dy = y2 - y1
+    steps = max(abs(dx), abs(dy))
+    k = np.arange(steps)
+    if steps == 0:
+        return k, k
+    
+    if abs(dx) >= abs(dy):
+        xs = k
+        ys = (2 * k * abs(dy) + abs(dx) - 1) // (2 * abs(dx))
+    else:
+        xs = (2 * k * abs(dx) + abs(dy) - 1) // (2 * abs(dy))
+        ys = k
+    return x1 + np.sign(dx) * xs, y1 + np.sign(dy) * ys
+
+
+def _add_evidence(logodds, xs, ys, delta):
+    """Add delta to each listed in-bounds cell (repeats add up), clamped to [L_MIN, L_MAX]."""
+    height, width = logodds.shape
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    xs = xs[inside]
+    ys = ys[inside]
+    np.add.at(logodds, (ys, xs), delta)
+    logodds[ys, xs] = np.clip(logodds[ys, xs], L_MIN, L_MAX)
+
+
+def _dda_mark_free(logodds, x1, y1, x2, y2):
+    """NumPy version of _bresenham_mark_free (used when Numba is unavailable)."""
+    xs, ys = _dda_trace(x1, y1, x2, y2)
+    _add_evidence(logodds, xs, ys, -L_FREE)
+
+
+def _scan_hits(shape, cos_t, sin_t, dists, car_x, car_y, max_d, obs_thresh):
+    """
+    Cells the scan kernels mark as hit (same gating and rounding as _rasterize_scan).
+    
+    Returns:
+        (xs, ys) arrays of the in-bounds hit cells, one per kept ray
+    """
+    height, width = shape
+    
+    # Gate obstacle marking: only mark if distance is within threshold
+    keep = (dists > 0) & (dists < max_d) & (dists <= obs_thresh)
+    d = dists[keep]
+    xs = np.rint(car_x + d * cos_t[keep]).astype(np.intp)
+    ys = np.rint(car_y + d * sin_t[keep]).astype(np.intp)
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return xs[inside], ys[inside]
+
+
+def _rasterize_scan_numpy(logodds, cos_t, sin_t, dists, car_x, car_y, max_d, obs_thresh):
+    """NumPy version of _rasterize_scan (used when Numba is unavailable)."""
+    xs, ys = _scan_hits(logodds.shape, cos_t, sin_t, dists, car_x, car_y, max_d, obs_thresh)
+    if xs.size == 0:
+        return
+    
+    # Evidence only moves one way per pass, so summing then clamping matches
+    # the kernel's per-update clamping
+    rays = [_dda_trace(car_x, car_y, x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+    _add_evidence(logodds, np.concatenate([r[0] for r in rays]),
+                  np.concatenate([r[1] for r in rays]), -L_FREE)
+    _add_evidence(logodds, xs, ys, L_OCC)
+
+
+# Prefer AOT kernels (no JIT warm-up), then JIT kernels; without Numba the
+# @njit kernels would run as interpreted loops, so use NumPy instead
+if AOT_KERNELS_AVAILABLE:
+    _mark_free = bresenham_mark_free
+    _rasterize = rasterize_scan
+elif NUMBA_AVAILABLE:
+    _mark_free = _bresenham_mark_free
+    _rasterize = _rasterize_scan
+else:
+    _mark_free = _dda_mark_free
+    _rasterize = _rasterize_scan_numpy
+
+
+def _scan_arrays(scan_data):
+    """
+    Get scan data as contiguous float32 (angles, distances) arrays.
+    
+    Args:
+        scan_data: (angles, distances) arrays as returned by scan_environment(),
+                   or a list of (angle, distance) tuples
+    
+    Returns:
+        (angles, distances) tuple of float32 numpy arrays
+    """
+    if isinstance(scan_data, tuple) and len(scan_data) == 2 and isinstance(scan_data[0], np.ndarray):
+        angles, distances = scan_data
+    else:
+        angles, distances = np.asarray(scan_data, dtype=np.float32).reshape(-1, 2).T
+    return (np.ascontiguousarray(angles, dtype=np.float32),
+            np.ascontiguousarray(distances, dtype=np.float32))
+
+
 class AdvancedMapper:
     """
     Advanced mapping system that builds a 2D occupancy grid from ultrasonic scans.
@@ -45,8 +316,12 @@ class AdvancedMapper:
         """
         self.map_size = map_size
         self.map_center = map_size // 2
-        # Use 3-state occupancy: unknown=-1, free=0, occupied=1
-        self.occupancy_map = np.full((map_size, map_size), UNKNOWN, dtype=np.int8)
+        # Accumulated evidence per cell (see L_OCC / L_FREE); 0 = no evidence yet
+        self.logodds = np.zeros((map_size, map_size), dtype=np.int16)
+        # 3-state occupancy derived from logodds: unknown=-1, free=0, occupied=1.
+        # Re-derived lazily (see occupancy_map) so per-ray updates stay O(ray length)
+        self._occupancy = np.full((map_size, map_size), UNKNOWN, dtype=np.int8)
+        self._occupancy_stale = False
         
         # Car position (in map coordinates, starts at center)
         self.car_x = self.map_center
@@ -54,7 +329,27 @@ class AdvancedMapper:
         self.car_angle = 0  # Car's heading angle (0 = facing +x direction)
         
         # Scan history for interpolation
-        self.scan_history = []
+        self.scan_history = (np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32))
+    
+    @property
+    def occupancy_map(self):
+        """
+        3-state occupancy grid (-1 = unknown, 0 = free, 1 = obstacle).
+        Re-thresholded from logodds on first read after an update, not per ray.
+        
+        The returned array is a view derived from logodds: editing it in place
+        is overwritten by the next re-threshold. Assign a whole grid instead
+        (map.occupancy_map = grid), which reseeds logodds like load_map().
+        """
+        if self._occupancy_stale:
+            self._update_occupancy()
+        return self._occupancy
+    
+    @occupancy_map.setter
+    def occupancy_map(self, grid):
+        # Copy into the existing buffer so references to it stay valid
+        self._occupancy[:] = grid
+        self._update_logodds()
     
     def polar_to_cartesian(self, angle_deg, distance_cm, car_x=None, car_y=None, car_angle=None):
         """
@@ -76,7 +371,7 @@ class AdvancedMapper:
             car_angle: Car's heading angle in degrees (0 = +x direction)
         
         Returns:
-            (x, y) tuple in map coordinates, or None if out of bounds
+            (x, y) tuple in map coordinates, or (-1, -1) if out of bounds
         """
         if car_x is None:
             car_x = self.car_x
@@ -85,21 +380,15 @@ class AdvancedMapper:
         if car_angle is None:
             car_angle = self.car_angle
         
-        # Convert angle to radians
-        # Angle convention: positive = right, so we negate to match math convention
-        # Math convention: positive = counterclockwise (left), so negate for right-positive
-        total_angle_rad = math.radians(car_angle - angle_deg)
-        
-        # Convert polar to Cartesian
-        x = car_x + distance_cm * math.cos(total_angle_rad)
-        y = car_y + distance_cm * math.sin(total_angle_rad)
+        # Same rounding as update_map_from_scan's hit cells, without NumPy overhead for one point
+        idx = round(car_angle - angle_deg) % 360
+        x = round(car_x + distance_cm * _COS[idx])
+        y = round(car_y + distance_cm * _SIN[idx])
         
-        # Check bounds (map_size is exclusive, so valid range is [0, map_size))
-        x_int = int(round(x))
-        y_int = int(round(y))
-        if 0 <= x_int < self.map_size and 0 <= y_int < self.map_size:
-            return (x_int, y_int)
-        return None
+        # (x | y) < 0 covers both negative checks in one comparison
+        if (x | y) < 0 or x >= self.map_size or y >= self.map_size:
+            return (-1, -1)
+        return (x, y)
     
     def scan_environment(self, hw, angle_min=SCAN_ANGLE_MIN, angle_max=SCAN_ANGLE_MAX, 
                         step=SCAN_STEP, interpolate=True):
@@ -114,30 +403,36 @@ class AdvancedMapper:
             interpolate: Whether to interpolate between scan points
         
         Returns:
-            List of (angle, distance) tuples
+            (angles, distances) tuple of float32 numpy arrays
         """
         servo = hw['servo']
         us = hw['ultrasonic']
         
-        scan_data = []
         angles = range(angle_min, angle_max + 1, step)
+        scan_angles = np.empty(len(angles), dtype=np.float32)
+        scan_dists = np.empty(len(angles), dtype=np.float32)
+        count = 0
+        # Mock servos move instantly, so only real hardware needs settle time
+        settle = not hw.get('is_mock')
+        # Resolve the sensor's read method once rather than probing it per angle
+        read_distance = getattr(us, 'get_distance', None) or us.read
         
         print(f"Scanning from {angle_min}° to {angle_max}° (step: {step}°)...")
         
         for angle in angles:
             # Set servo angle
             servo.set_angle(angle)
-            time.sleep(SERVO_DELAY)  # Wait for servo to move
+            if settle:
+                time.sleep(SERVO_DELAY)  # Wait for servo to move
             
             # Read distance
-            if hasattr(us, 'get_distance'):
-                distance = us.get_distance()
-            else:
-                distance = us.read()
+            distance = read_distance()
             
             # Only add valid readings (skip invalid/no-return readings)
             if 0 < distance < MAX_DISTANCE:
-                scan_data.append((angle, distance))
+                scan_angles[count] = angle
+                scan_dists[count] = distance
+                count += 1
                 print(f"  Angle {angle:3d}deg: {distance:5.1f} cm")
             else:
                 # Invalid reading - skip it (don't mark as obstacle)
@@ -145,9 +440,11 @@ class AdvancedMapper:
         
         # Return servo to center
         servo.set_angle(0)
-        time.sleep(SERVO_DELAY)
+        if settle:
+            time.sleep(SERVO_DELAY)
         
         # Store scan history
+        scan_data = (scan_angles[:count], scan_dists[:count])
         self.scan_history = scan_data
         
         # Interpolate if requested
@@ -161,52 +458,41 @@ class AdvancedMapper:
         Interpolate between scan points to fill gaps.
         
         Args:
-            scan_data: List of (angle, distance) tuples
+            scan_data: (angles, distances) arrays or list of (angle, distance) tuples
             step: Original step size (for determining interpolation density)
         
         Returns:
-            Interpolated list of (angle, distance) tuples
+            Interpolated (angles, distances) tuple of float32 numpy arrays
         """
-        if len(scan_data) < 2:
-            return scan_data
+        angles, distances = _scan_arrays(scan_data)
+        if angles.size < 2:
+            return angles, distances
         
-        interpolated = []
+        order = np.argsort(angles, kind='stable')
+        angles = angles[order].astype(np.float64)
+        distances = distances[order].astype(np.float64)
         
-        for i in range(len(scan_data) - 1):
-            angle1, dist1 = scan_data[i]
-            angle2, dist2 = scan_data[i + 1]
-            
-            # Add original point
-            interpolated.append((angle1, dist1))
-            
-            # Interpolate between points
-            # Use smaller step for interpolation (e.g., every 5 degrees)
-            interp_step = min(5, step // 2)
-            num_points = abs(angle2 - angle1) // interp_step
-            
-            if num_points > 1:
-                for j in range(1, num_points):
-                    interp_angle = angle1 + j * interp_step * (1 if angle2 > angle1 else -1)
-                    # Linear interpolation
-                    t = j / num_points
-                    interp_dist = dist1 + (dist2 - dist1) * t
-                    interpolated.append((interp_angle, interp_dist))
+        # Use smaller step for interpolation (e.g., every 5 degrees)
+        interp_step = max(1, min(5, step // 2))
         
-        # Add last point
-        if scan_data:
-            interpolated.append(scan_data[-1])
+        # Keep the original points and fill the gaps with a regular angle grid
+        grid = np.union1d(np.arange(angles[0], angles[-1], interp_step), angles)
+        interp_dist = np.interp(grid, angles, distances)
         
-        return interpolated
+        return grid.astype(np.float32), interp_dist.astype(np.float32)
     
     def update_map_from_scan(self, scan_data, car_x=None, car_y=None, car_angle=None):
         """
         Update the occupancy map from scan data.
         
         Args:
-            scan_data: List of (angle, distance) tuples
+            scan_data: (angles, distances) arrays or list of (angle, distance) tuples
             car_x: Car's x position (default: current position)
             car_y: Car's y position (default: current position)
             car_angle: Car's heading angle (default: current angle)
+        
+        Returns:
+            Number of cells that became obstacles with this scan
         """
         if car_x is None:
             car_x = self.car_x
@@ -215,29 +501,30 @@ class AdvancedMapper:
         if car_angle is None:
             car_angle = self.car_angle
         
-        obstacles_found = 0
+        angles, distances = _scan_arrays(scan_data)
         
-        for angle, distance in scan_data:
-            # Gate obstacle marking: only mark if distance is within threshold
-            if distance <= 0 or distance >= MAX_DISTANCE or distance > OBSTACLE_THRESHOLD:
-                continue
-            
-            # Convert to Cartesian coordinates
-            hit_pos = self.polar_to_cartesian(angle, distance, car_x, car_y, car_angle)
-            
-            if not hit_pos:
-                continue
-            
-            x_hit, y_hit = hit_pos
-            
-            # Mark free space along the ray from car to (just before) hit
-            # This marks all cells from car to obstacle as free
-            self.mark_free_space(car_x, car_y, x_hit, y_hit)
-            
-            # Mark occupied at hit point
-            if self.occupancy_map[y_hit, x_hit] != OCCUPIED:
-                self.occupancy_map[y_hit, x_hit] = OCCUPIED
-                obstacles_found += 1
+        # Ray directions only depend on car_angle - angle: look them up once per scan
+        idx = np.rint(car_angle - angles).astype(np.intp) % 360
+        
+        cos_t = _COS[idx]
+        sin_t = _SIN[idx]
+        
+        # Only hit cells gain evidence, so only they can newly become obstacles:
+        # compare just those before and after instead of the whole grid
+        hit_x, hit_y = _scan_hits(self.logodds.shape, cos_t, sin_t, distances, car_x, car_y,
+                                  MAX_DISTANCE, OBSTACLE_THRESHOLD)
+        was_occupied = self.logodds[hit_y, hit_x] > L_THRESH
+        
+        # Trace every ray and add its evidence in a single kernel call
+        _rasterize(
+            self.logodds, cos_t, sin_t, distances, car_x, car_y,
+            MAX_DISTANCE, OBSTACLE_THRESHOLD
+        )
+        self._occupancy_stale = True
+        
+        # Two rays can hit the same cell: count each new obstacle cell once
+        became_occupied = (self.logodds[hit_y, hit_x] > L_THRESH) & ~was_occupied
+        obstacles_found = np.unique(hit_y[became_occupied] * self.map_size + hit_x[became_occupied]).size
         
         print(f"Map updated: {obstacles_found} new obstacles marked")
         return obstacles_found
@@ -246,34 +533,28 @@ class AdvancedMapper:
         """
         Mark cells along the line from (x1, y1) to (x2, y2) as free space.
         Uses Bresenham's line algorithm.
-        Marks all cells up to (but not including) the end point as free.
+        Adds free evidence to all cells up to (but not including) the end point.
         
         Args:
             x1, y1: Start point (car position)
             x2, y2: End point (obstacle position - this cell is NOT marked as free)
         """
-        # Bresenham's line algorithm
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
-        sx = 1 if x1 < x2 else -1
-        sy = 1 if y1 < y2 else -1
-        err = dx - dy
-        
-        x, y = x1, y1
-        
-        while not (x == x2 and y == y2):
-            # Mark as free (but don't overwrite obstacles)
-            if 0 <= x < self.map_size and 0 <= y < self.map_size:
-                if self.occupancy_map[y, x] != OCCUPIED:
-                    self.occupancy_map[y, x] = FREE
-            
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x += sx
-            if e2 < dx:
-                err += dx
-                y += sy
+        _mark_free(self.logodds, x1, y1, x2, y2)
+        self._occupancy_stale = True
+    
+    def _update_occupancy(self):
+        """Derive the 3-state occupancy_map from the log-odds evidence (in place)."""
+        self._occupancy.fill(UNKNOWN)
+        self._occupancy[self.logodds < -L_THRESH] = FREE
+        self._occupancy[self.logodds > L_THRESH] = OCCUPIED
+        self._occupancy_stale = False
+    
+    def _update_logodds(self):
+        """Seed the log-odds evidence from occupancy_map (after loading a map)."""
+        self.logodds.fill(0)
+        self.logodds[self._occupancy == FREE] = -L_FREE
+        self.logodds[self._occupancy == OCCUPIED] = L_OCC
+        self._occupancy_stale = False
     
     def get_map(self):
         """
@@ -295,26 +576,19 @@ class AdvancedMapper:
         print("Occupancy Map (-1=unknown, 0=free, 1=obstacle, C=car)")
         print("=" * (self.map_size + 2))
         
-        obstacles = 0
-        free_cells = 0
-        unknown_cells = 0
-        
-        for y in range(self.map_size):
-            line = "|"
-            for x in range(self.map_size):
-                if show_car and x == self.car_x and y == self.car_y:
-                    line += "C"
-                elif self.occupancy_map[y, x] == OCCUPIED:
-                    line += "1"
-                    obstacles += 1
-                elif self.occupancy_map[y, x] == FREE:
-                    line += "."
-                    free_cells += 1
-                else:  # UNKNOWN
-                    line += "?"
-                    unknown_cells += 1
-            line += "|"
-            print(line)
+        # Count cells per state: index 0 = unknown, 1 = free, 2 = obstacle
+        counts = np.bincount(self.occupancy_map.ravel() + 1, minlength=3)
+        glyphs = _GLYPHS[self.occupancy_map + 1]
+        
+        if show_car and 0 <= self.car_x < self.map_size and 0 <= self.car_y < self.map_size:
+            # The car's cell is drawn as C and not counted
+            counts[self.occupancy_map[self.car_y, self.car_x] + 1] -= 1
+            glyphs[self.car_y, self.car_x] = b'C'
+        unknown_cells, free_cells, obstacles = counts.tolist()
+        
+        # View each row of glyphs as a single bytes string
+        rows = glyphs.view(f"S{self.map_size}").ravel().tolist()
+        print("\n".join(f"|{row.decode()}|" for row in rows))
         
         print("=" * (self.map_size + 2))
         print(f"Car position: ({self.car_x}, {self.car_y}), heading: {self.car_angle}deg")
@@ -333,35 +607,78 @@ class AdvancedMapper:
             distance_cm: Distance to move forward in centimeters (after rotation)
             delta_angle_deg: Change in heading angle (positive = turn right, negative = turn left)
         """
+        # Heartbeat updates (no motion) leave the pose untouched
+        if delta_angle_deg == 0 and distance_cm == 0:
+            return
+        
         # Step 1: Update car angle (rotation)
-        self.car_angle = (self.car_angle + delta_angle_deg) % 360
+        if delta_angle_deg:
+            self.car_angle = (self.car_angle + delta_angle_deg) % 360
         
         # Step 2: Update car position (translation in new heading direction)
         if distance_cm > 0:
-            angle_rad = math.radians(self.car_angle)
-            self.car_x += int(round(distance_cm * math.cos(angle_rad)))
-            self.car_y += int(round(distance_cm * math.sin(angle_rad)))
+            idx = round(self.car_angle) % 360
+            x = self.car_x + round(distance_cm * _COS[idx])
+            y = self.car_y + round(distance_cm * _SIN[idx])
             
             # Keep within bounds
-            self.car_x = max(0, min(self.map_size - 1, self.car_x))
-            self.car_y = max(0, min(self.map_size - 1, self.car_y))
+            last = self.map_size - 1
+            self.car_x = 0 if x < 0 else (last if x > last else x)
+            self.car_y = 0 if y < 0 else (last if y > last else y)
     
     def clear_map(self):
         """Clear the occupancy map (reset to unknown)."""
-        self.occupancy_map = np.full((self.map_size, self.map_size), UNKNOWN, dtype=np.int8)
+        # Reuse the existing buffers so references to them stay valid
+        self.logodds.fill(0)
+        self._occupancy.fill(UNKNOWN)
+        self._occupancy_stale = False
         print("Map cleared (reset to unknown)")
     
+    def get_packed_map(self):
+        """
+        Get the map as two bit-packed bitmaps (2 bits per cell instead of 8).
+        
+        Returns:
+            (observed, occupied) uint8 arrays of shape (map_size, ceil(map_size / 8)),
+            one bit per cell along each row (see np.packbits)
+        """
+        observed = np.packbits(self.occupancy_map != UNKNOWN, axis=1)
+        occupied = np.packbits(self.occupancy_map == OCCUPIED, axis=1)
+        return observed, occupied
+    
+    def set_packed_map(self, observed, occupied):
+        """
+        Restore the map from bitmaps produced by get_packed_map().
+        
+        Args:
+            observed: Bit-packed "cell has been observed" bitmap
+            occupied: Bit-packed "cell is an obstacle" bitmap
+        """
+        observed = np.unpackbits(observed, axis=1, count=self.map_size).astype(bool)
+        occupied = np.unpackbits(occupied, axis=1, count=self.map_size).astype(bool)
+        self._occupancy[:] = UNKNOWN
+        self._occupancy[observed] = FREE
+        self._occupancy[observed & occupied] = OCCUPIED
+        self._update_logodds()
+    
     def save_map(self, filename="map.npy"):
-        """Save map to file."""
-        np.save(filename, self.occupancy_map)
+        """Save map to file (bit-packed if filename ends with .npz)."""
+        if filename.endswith(".npz"):
+            observed, occupied = self.get_packed_map()
+            np.savez(filename, observed=observed, occupied=occupied)
+        else:
+            np.save(filename, self.occupancy_map)
         print(f"Map saved to {filename}")
     
     def load_map(self, filename="map.npy"):
-        """Load map from file."""
-        self.occupancy_map = np.load(filename)
+        """Load map from file (bit-packed if filename ends with .npz)."""
+        if filename.endswith(".npz"):
+            with np.load(filename) as packed:
+                self.set_packed_map(packed["observed"], packed["occupied"])
+        else:
+            self.occupancy_map = np.load(filename)
         print(f"Map loaded from {filename}")
 
-
 def test_mapping():
     """Test the mapping system."""
     print("=" * 60)
@@ -403,7 +720,7 @@ def test_mapping():
     
     for angle, dist in test_cases:
         pos = mapper.polar_to_cartesian(angle, dist)
-        if pos:
+        if pos[0] >= 0:
             print(f"  Angle {angle:3d}deg, Distance {dist:3d}cm -> ({pos[0]}, {pos[1]})")
         else:
             print(f"  Angle {angle:3d}deg, Distance {dist:3d}cm -> Out of bounds")
@@ -0,0 +1,33 @@
+"""
+Build the fast_ultrasonic C extension (HC-SR04 ping timed in C).
+Run this once on the Raspberry Pi; it needs a C compiler and libgpiod:
+
+    sudo apt install libgpiod-dev
+    python build_fast_ultrasonic.py
+
+hardware_mock.py picks up the compiled module automatically when it is
+present and falls back to the picar library's Python sensor otherwise.
+"""
+
+import os
+from setuptools import Extension, setup
+
+MODULE_NAME = "fast_ultrasonic"
+
+
+def build_fast_ultrasonic():
+    """Compile the extension in place, next to this script"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(here)
+
+    print(f"Compiling {MODULE_NAME} into {here}...")
+    setup(
+        name=MODULE_NAME,
+        ext_modules=[Extension(MODULE_NAME, [f"{MODULE_NAME}.c"], libraries=["gpiod"])],
+        script_args=["build_ext", "--inplace"],
+    )
+    print(f"Done. hardware_mock.py will now use {MODULE_NAME} automatically.")
+
+
+if __name__ == "__main__":
+    build_fast_ultrasonic()
@@ -0,0 +1,41 @@
+"""
+Ahead-of-time compile the mapping kernels from advanced_mapping.py.
+Run this once on the Raspberry Pi to build a native mapping_kernels module,
+so the first scan doesn't pay several seconds of Numba JIT compilation.
+
+Usage:
+    python build_kernels.py
+
+advanced_mapping.py picks up the compiled module automatically when it is
+present and falls back to JIT (or plain NumPy) otherwise.
+"""
+
+import os
+from numba.pycc import CC
+
+from advanced_mapping import _bresenham_mark_free, _rasterize_scan
+
+MODULE_NAME = "mapping_kernels"
+
+
+def build_kernels():
+    """Compile the kernels into a native extension next to this script"""
+    cc = CC(MODULE_NAME)
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    # Signatures must match how AdvancedMapper calls the kernels
+    cc.export('bresenham_mark_free', 'void(int16[:,:], i8, i8, i8, i8)')(
+        _bresenham_mark_free.py_func
+    )
+    # AOT ignores parallel=True, so the compiled scan kernel traces rays serially
+    cc.export('rasterize_scan', 'void(int16[:,:], f8[:], f8[:], f4[:], i8, i8, f8, f8)')(
+        _rasterize_scan.py_func
+    )
+    
+    print(f"Compiling {MODULE_NAME} into {cc.output_dir}...")
+    cc.compile()
+    print(f"Done. advanced_mapping.py will now use {MODULE_NAME} automatically.")
+
+
+if __name__ == "__main__":
+    build_kernels()
@@ -4,11 +4,48 @@ Run this script to download the model file needed for object_detection.py
 """
 
 import os
+import shutil
+import urllib.error
 import urllib.request
 
 MODEL_DIR = "models"
-MODEL_NAME = "efficientdet_lite0.tflite"
-MODEL_URL = "https://storage.googleapis.com/mediapipe-models/object_detector/efficientdet_lite0/float16/1/efficientdet_lite0.tflite"
+# INT8-quantized variant: ~2-3x faster than float on the Pi's CPU for <=1% mAP
+# (float16: replace "int8" with "float16" in the URL)
+MODEL_NAME = "efficientdet_lite0_int8.tflite"
+MODEL_URL = "https://storage.googleapis.com/mediapipe-models/object_detector/efficientdet_lite0/int8/1/efficientdet_lite0.tflite"
+CHUNK_SIZE = 1 << 20  # 1 MB read buffer (urlretrieve reads 8 KB at a time)
+
+def fetch(url, path):
+    """
+    Stream url to path, resuming a previously interrupted download.
+    
+    Data is written to path + ".part" and renamed to path only once complete,
+    so a failed download never leaves a truncated model behind.
+    """
+    part_path = path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+        print(f"Resuming from {offset / (1024*1024):.2f} MB")
+    
+    try:
+        response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+        if offset and e.code == 416:
+            # Range not satisfiable: the partial file already holds everything
+            os.replace(part_path, path)
+            return
+        raise
+    
+    with response:
+        # 206 means the server honoured the Range header; otherwise start over
+        mode = "ab" if offset and response.status == 206 else "wb"
+        with open(part_path, mode) as f:
+            shutil.copyfileobj(response, f, length=CHUNK_SIZE)
+    
+    os.replace(part_path, path)
 
 def download_model():
     """Download the EfficientDet-Lite model"""
@@ -24,11 +61,11 @@ def download_model():
         if response.lower() != 'y':
             return model_path
     
-    print(f"Downloading EfficientDet-Lite0 model from {MODEL_URL}...")
+    print(f"Downloading EfficientDet-Lite0 (int8) model from {MODEL_URL}...")
     print(f"Target: {model_path}")
     
     try:
-        urllib.request.urlretrieve(MODEL_URL, model_path)
+        fetch(MODEL_URL, model_path)
         print(f"Model downloaded successfully to {model_path}")
         print(f"File size: {os.path.getsize(model_path) / (1024*1024):.2f} MB")
         return model_path
@@ -3,15 +3,16 @@
 # Run this to get the model file needed for object_detection.py
 
 MODEL_DIR="models"
-MODEL_NAME="efficientdet_lite0.tflite"
-MODEL_URL="https://storage.googleapis.com/mediapipe-models/object_detector/efficientdet_lite0/float16/1/efficientdet_lite0.tflite"
+# INT8-quantized variant (float16: replace "int8" with "float16" in the URL)
+MODEL_NAME="efficientdet_lite0_int8.tflite"
+MODEL_URL="https://storage.googleapis.com/mediapipe-models/object_detector/efficientdet_lite0/int8/1/efficientdet_lite0.tflite"
 
 # Create models directory if it doesn't exist
 mkdir -p "$MODEL_DIR"
 
-# Download model
-echo "Downloading EfficientDet-Lite0 model..."
-curl -L "$MODEL_URL" -o "$MODEL_DIR/$MODEL_NAME"
+# Download model (-C - resumes an interrupted download)
+echo "Downloading EfficientDet-Lite0 (int8) model..."
+curl -L -C - "$MODEL_URL" -o "$MODEL_DIR/$MODEL_NAME"
 
 if [ $? -eq 0 ]; then
     echo "Model downloaded successfully to $MODEL_DIR/$MODEL_NAME"
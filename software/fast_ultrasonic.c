@@ -0,0 +1,143 @@
+/*
+ * fast_ultrasonic: HC-SR04 ping timed in C.
+ *
+ * Triggers the sensor and times the echo pulse in a tight loop against
+ * CLOCK_MONOTONIC_RAW with the GIL released, so Python overhead and other
+ * threads can't stretch the measured pulse width.
+ *
+ * Uses the libgpiod v1 API (Raspberry Pi OS Bookworm: apt install libgpiod-dev).
+ * Build with:  python build_fast_ultrasonic.py
+ *
+ * Python API:
+ *     open(chip, trig, echo)  - claim the two GPIO lines (BCM numbers)
+ *     ping(timeout)           - distance in cm, or -1 on timeout
+ *     close()                 - release the lines
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <gpiod.h>
+#include <time.h>
+
+#define CONSUMER "fast_ultrasonic"
+#define HALF_SPEED_OF_SOUND_CM 17150.0  /* 343 m/s, there and back */
+
+static struct gpiod_chip *chip = NULL;
+static struct gpiod_line *trig_line = NULL;
+static struct gpiod_line *echo_line = NULL;
+
+static double now_s(void)
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC_RAW, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+static void release_lines(void)
+{
+    if (trig_line) gpiod_line_release(trig_line);
+    if (echo_line) gpiod_line_release(echo_line);
+    if (chip) gpiod_chip_close(chip);
+    trig_line = echo_line = NULL;
+    chip = NULL;
+}
+
+static PyObject *fu_open(PyObject *self, PyObject *args)
+{
+    const char *chip_name;
+    unsigned int trig, echo;
+
+    if (!PyArg_ParseTuple(args, "sII", &chip_name, &trig, &echo))
+        return NULL;
+
+    release_lines();
+    chip = gpiod_chip_open_lookup(chip_name);
+    if (!chip)
+        goto fail;
+    trig_line = gpiod_chip_get_line(chip, trig);
+    echo_line = gpiod_chip_get_line(chip, echo);
+    if (!trig_line || !echo_line)
+        goto fail;
+    if (gpiod_line_request_output(trig_line, CONSUMER, 0) < 0) {
+        trig_line = NULL;
+        goto fail;
+    }
+    if (gpiod_line_request_input(echo_line, CONSUMER) < 0) {
+        echo_line = NULL;
+        goto fail;
+    }
+    Py_RETURN_NONE;
+
+fail:
+    PyErr_SetFromErrno(PyExc_OSError);
+    release_lines();
+    return NULL;
+}
+
+static PyObject *fu_ping(PyObject *self, PyObject *args)
+{
+    double timeout = 0.02;
+    double t0, t1, deadline;
+    int ok = 1;
+
+    if (!PyArg_ParseTuple(args, "|d", &timeout))
+        return NULL;
+    if (!chip) {
+        PyErr_SetString(PyExc_RuntimeError, "fast_ultrasonic.open() has not been called");
+        return NULL;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    /* 10 us trigger pulse */
+    struct timespec pulse = {0, 10000};
+    gpiod_line_set_value(trig_line, 0);
+    nanosleep(&pulse, NULL);
+    gpiod_line_set_value(trig_line, 1);
+    nanosleep(&pulse, NULL);
+    gpiod_line_set_value(trig_line, 0);
+
+    /* Wait for the echo to go high, then time how long it stays high */
+    t0 = now_s();
+    deadline = t0 + timeout;
+    while (gpiod_line_get_value(echo_line) == 0) {
+        t0 = now_s();
+        if (t0 > deadline) { ok = 0; break; }
+    }
+    t1 = t0;
+    if (ok) {
+        deadline = t0 + timeout;
+        while (gpiod_line_get_value(echo_line) == 1) {
+            t1 = now_s();
+            if (t1 > deadline) { ok = 0; break; }
+        }
+    }
+    Py_END_ALLOW_THREADS
+
+    if (!ok)
+        return PyFloat_FromDouble(-1.0);
+    /* Two decimals, like the picar libraries */
+    return PyFloat_FromDouble(((long)((t1 - t0) * HALF_SPEED_OF_SOUND_CM * 100.0 + 0.5)) / 100.0);
+}
+
+static PyObject *fu_close(PyObject *self, PyObject *args)
+{
+    release_lines();
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef fu_methods[] = {
+    {"open", fu_open, METH_VARARGS, "open(chip, trig, echo): claim the trigger/echo GPIO lines"},
+    {"ping", fu_ping, METH_VARARGS, "ping(timeout=0.02): distance in cm, or -1 on timeout"},
+    {"close", fu_close, METH_NOARGS, "close(): release the GPIO lines"},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef fu_module = {
+    PyModuleDef_HEAD_INIT, "fast_ultrasonic",
+    "HC-SR04 ultrasonic ping timed in C (libgpiod)", -1, fu_methods
+};
+
+PyMODINIT_FUNC PyInit_fast_ultrasonic(void)
+{
+    return PyModule_Create(&fu_module);
+}
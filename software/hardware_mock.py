@@ -10,57 +10,75 @@ This module provides a compatible interface that works with both:
 Your code will work on both PC (with mocks) and Raspberry Pi (with real hardware).
 """
 
-import time
 import sys
-import random
+import time
+import functools
+import threading
+import numpy as np
+
+# Optional C ultrasonic backend (build on the Pi with build_fast_ultrasonic.py)
+try:
+    import fast_ultrasonic
+    FAST_ULTRASONIC_AVAILABLE = True
+except ImportError:
+    FAST_ULTRASONIC_AVAILABLE = False
+
+# Number of noise samples MockUltrasonic pre-generates at a time
+NOISE_BUFFER_SIZE = 4096
+# Seconds between UltrasonicPoller readings (HC-SR04 needs ~60 ms between triggers)
+POLL_INTERVAL = 0.06
+# GPIO chips to try for the fast ultrasonic backend (Pi 5 on older kernels, then Pi 4 / Pi 5)
+FAST_ULTRASONIC_CHIPS = ('gpiochip4', 'gpiochip0')
 
 class MockForward:
     """Mock forward control for testing on PC - matches picar-4wd forward API"""
-    def __init__(self):
+    def __init__(self, verbose=False):
         self.power = 0
         self.is_moving = False
+        self.verbose = verbose  # Print each mock call (off by default, stdout is slow)
     
     def forward(self, power=50):
         """Mock forward movement - matches picar-4wd API"""
         self.power = power
         self.is_moving = True
-        print(f"[MOCK] Moving forward at power: {power}%")
-        time.sleep(0.1)
+        if self.verbose:
+            print(f"[MOCK] Moving forward at power: {power}%")
     
     def backward(self, power=50):
         """Mock backward movement"""
         self.power = -power
         self.is_moving = True
-        print(f"[MOCK] Moving backward at power: {power}%")
-        time.sleep(0.1)
+        if self.verbose:
+            print(f"[MOCK] Moving backward at power: {power}%")
     
     def stop(self):
         """Mock stop"""
         self.power = 0
         self.is_moving = False
-        print("[MOCK] Stopped")
-        time.sleep(0.1)
+        if self.verbose:
+            print("[MOCK] Stopped")
     
     def turn_left(self, power=50):
         """Mock left turn"""
-        print(f"[MOCK] Turning left at power: {power}%")
-        time.sleep(0.1)
+        if self.verbose:
+            print(f"[MOCK] Turning left at power: {power}%")
     
     def turn_right(self, power=50):
         """Mock right turn"""
-        print(f"[MOCK] Turning right at power: {power}%")
-        time.sleep(0.1)
+        if self.verbose:
+            print(f"[MOCK] Turning right at power: {power}%")
 
 class MockServo:
     """Mock servo control for testing on PC - matches picar-4wd servo API"""
-    def __init__(self):
+    def __init__(self, verbose=False):
         self.angle = 0
+        self.verbose = verbose  # Print each mock call (off by default, stdout is slow)
     
     def set_angle(self, angle):
         """Mock servo angle setting - matches picar-4wd API"""
         self.angle = angle
-        print(f"[MOCK] Servo angle set to: {angle} degrees")
-        time.sleep(0.05)
+        if self.verbose:
+            print(f"[MOCK] Servo angle set to: {angle} degrees")
     
     def get_angle(self):
         """Get current servo angle"""
@@ -68,16 +86,26 @@ class MockServo:
 
 class MockUltrasonic:
     """Mock ultrasonic sensor for testing on PC - matches picar-4wd ultrasonic API"""
-    def __init__(self):
+    def __init__(self, verbose=False):
         self.distance = 100  # Default mock distance in cm
         self.base_distance = 50  # Base distance for simulation
+        self.verbose = verbose  # Print each reading (off by default, stdout is slow)
+        self._rng = np.random.default_rng()
+        # Noise is drawn in bulk and handed out one sample per reading
+        self._noise = self._rng.integers(-3, 4, size=NOISE_BUFFER_SIZE).tolist()
+        self._noise_idx = 0
     
     def get_distance(self):
         """Mock distance reading - matches picar-4wd API (uses get_distance(), not read())"""
         # Simulate realistic sensor readings with some noise
-        noise = random.randint(-3, 3)
+        if self._noise_idx >= NOISE_BUFFER_SIZE:
+            self._noise = self._rng.integers(-3, 4, size=NOISE_BUFFER_SIZE).tolist()
+            self._noise_idx = 0
+        noise = self._noise[self._noise_idx]
+        self._noise_idx += 1
         distance = max(5, self.base_distance + noise)
-        print(f"[MOCK] Ultrasonic reading: {distance} cm")
+        if self.verbose:
+            print(f"[MOCK] Ultrasonic reading: {distance} cm")
         return distance
     
     def read(self):
@@ -88,8 +116,64 @@ class MockUltrasonic:
         """Set base distance for simulation (useful for testing different scenarios)"""
         self.base_distance = distance
 
+class FastUltrasonic:
+    """
+    Ultrasonic sensor backed by the fast_ultrasonic C extension.
+    Same read()/get_distance() API as the picar sensors; the trigger pulse and
+    echo timing happen in C instead of per-call Python GPIO.
+    """
+    def __init__(self, timeout=0.02):
+        self.timeout = timeout  # Echo timeout in seconds (0.02s is ~3.4m)
+    
+    def get_distance(self):
+        """Distance in cm, or -1 if the echo timed out"""
+        return fast_ultrasonic.ping(self.timeout)
+    
+    def read(self):
+        """Alias for get_distance() for compatibility"""
+        return fast_ultrasonic.ping(self.timeout)
+
+def _pin_number(pin):
+    """BCM number of a picar Pin object (picar-4wd uses _pin, robot_hat uses _pin_num)"""
+    for attr in ('_pin_num', '_pin'):
+        number = getattr(pin, attr, None)
+        if isinstance(number, int):
+            return number
+    raise AttributeError(f"can't find a GPIO number on {pin!r}")
+
+def _fast_ultrasonic(us, fallback=None):
+    """
+    Swap a picar ultrasonic sensor for FastUltrasonic when the C extension is built.
+    
+    Args:
+        us: The picar library's ultrasonic object (has .trig and .echo pins)
+        fallback: Sensor to return if the C backend can't be used (default: us)
+    
+    Returns:
+        FastUltrasonic on success, otherwise fallback
+    """
+    if fallback is None:
+        fallback = us
+    if not FAST_ULTRASONIC_AVAILABLE:
+        return fallback
+    try:
+        trig, echo = _pin_number(us.trig), _pin_number(us.echo)
+    except AttributeError as e:
+        print(f"[INFO] fast_ultrasonic: {e}, using Python ultrasonic")
+        return fallback
+    for chip in FAST_ULTRASONIC_CHIPS:
+        try:
+            fast_ultrasonic.open(chip, trig, echo)
+        except OSError:
+            continue
+        print(f"[INFO] Using fast_ultrasonic ({chip}, trig={trig}, echo={echo})")
+        return FastUltrasonic()
+    print("[INFO] fast_ultrasonic: couldn't claim GPIO lines, using Python ultrasonic")
+    return fallback
+
+@functools.lru_cache(maxsize=1)
 def is_raspberry_pi():
-    """Check if running on Raspberry Pi"""
+    """Check if running on Raspberry Pi (result is cached after the first call)"""
     try:
         with open('/proc/cpuinfo', 'r') as f:
             cpuinfo = f.read()
@@ -107,12 +191,18 @@ def is_raspberry_pi():
     
     return False
 
+# Hardware interface shared by every get_hardware() caller
+_HW_CACHE = None
+
 def get_hardware():
     """
     Returns appropriate hardware interface based on platform.
     On PC: returns mock objects
     On Pi: tries PiCar-X first, then PiCar-4WD, then mocks
     
+    The interface is built once and reused, so the car is only initialized once
+    per process no matter how many modules ask for it.
+    
     Usage:
         hw = get_hardware()
         hw['forward'](50)              # Works on both PC and Pi
@@ -120,6 +210,13 @@ def get_hardware():
         hw['servo'].set_angle(90)      # Works on both
         distance = hw['ultrasonic'].read()  # Works on both
     """
+    global _HW_CACHE
+    if _HW_CACHE is None:
+        _HW_CACHE = _build_hardware()
+    return _HW_CACHE
+
+def _build_hardware():
+    """Builds the hardware interface returned by get_hardware()"""
     if is_raspberry_pi():
         # Try PiCar-X first (your hardware)
         try:
@@ -150,7 +247,7 @@ def get_hardware():
                 def get_angle(self):
                     return self.angle
             
-            # Create ultrasonic wrapper
+            # Create ultrasonic wrapper (Python fallback for fast_ultrasonic)
             class PiCarXUltrasonicWrapper:
                 def __init__(self, picarx_instance):
                     self.px = picarx_instance
@@ -169,7 +266,7 @@ def get_hardware():
                 'turn_right': turn_right_wrapper,
                 'stop': lambda: px.stop(),
                 'servo': PiCarXServoWrapper(px),  # Wrapper for camera pan servo
-                'ultrasonic': PiCarXUltrasonicWrapper(px),  # Wrapper for ultrasonic
+                'ultrasonic': _fast_ultrasonic(px.ultrasonic, PiCarXUltrasonicWrapper(px)),
                 'is_mock': False,
                 'hardware_type': 'picar-x'
             }
@@ -186,7 +283,7 @@ def get_hardware():
                     'turn_right': lambda p: fc.turn_right(p),
                     'stop': lambda: fc.stop(),
                     'servo': fc.servo,  # Servo object from picar_4wd
-                    'ultrasonic': fc.us,  # Ultrasonic object from picar_4wd
+                    'ultrasonic': _fast_ultrasonic(fc.us),  # Ultrasonic object from picar_4wd (C ping if built)
                     'is_mock': False,
                     'hardware_type': 'picar-4wd'
                 }
@@ -201,11 +298,16 @@ def get_hardware():
     else:
         return get_mock_hardware()
 
-def get_mock_hardware():
-    """Returns mock hardware for PC development"""
-    mock_forward = MockForward()
-    mock_servo = MockServo()
-    mock_ultrasonic = MockUltrasonic()
+def get_mock_hardware(verbose=False):
+    """
+    Returns mock hardware for PC development
+    
+    Args:
+        verbose: If True, mocks print every call (e.g. "[MOCK] Stopped")
+    """
+    mock_forward = MockForward(verbose)
+    mock_servo = MockServo(verbose)
+    mock_ultrasonic = MockUltrasonic(verbose)
     
     return {
         'px': None,  # Not available in mock mode
@@ -235,3 +337,79 @@ def get_picar_components():
     """
     hw = get_hardware()
     return hw['forward'], hw['servo'], hw['ultrasonic']
+
+class UltrasonicPoller:
+    """
+    Reads the ultrasonic sensor on a background thread.
+    The echo wait happens off the caller's loop, which just reads the latest
+    sample without blocking, so servo and motor commands keep flowing.
+    
+    Use one poller per sensor at a time, and stop() it before starting the
+    next: two threads pinging the same HC-SR04 read each other's echoes.
+    
+    Usage:
+        poller = UltrasonicPoller(hw['ultrasonic']).start()
+        try:
+            taken_at, distance = poller.get_latest()
+        finally:
+            poller.stop()
+    """
+    
+    def __init__(self, us, interval=POLL_INTERVAL):
+        """
+        Args:
+            us: Ultrasonic sensor (with get_distance() or read())
+            interval: Seconds to wait between readings (HC-SR04 needs ~60 ms)
+        """
+        self.us = us
+        self.interval = interval
+        self._read = getattr(us, 'get_distance', None) or us.read
+        # Single-slot (monotonic time the ping was triggered, distance) sample;
+        # a tuple assignment is atomic in CPython
+        self.sample = (float('-inf'), None)
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    @property
+    def latest(self):
+        """Distance of the newest sample in cm"""
+        return self.sample[1]
+    
+    def get_latest(self):
+        """Newest (trigger timestamp, distance) sample"""
+        return self.sample
+    
+    def start(self):
+        """Take a first reading, then start polling in the background"""
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("UltrasonicPoller is already running; stop() it first")
+        self._stop_event.clear()
+        self._sample_once()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def _sample_once(self):
+        taken_at = time.monotonic()  # When the ping was triggered
+        self.sample = (taken_at, self._read())
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample_once()
+    
+    def stop(self):
+        """
+        Stop polling, waiting for a ping in progress to finish.
+        
+        Returns:
+            True once the polling thread has exited, False if a ping is still
+            stuck after the timeout (the thread is kept so start() refuses)
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                print("[WARNING] Ultrasonic poller did not stop within 1 s")
+                return False
+            self._thread = None
+        return True
@@ -16,54 +16,112 @@ Secondary backend: vilib (PiCar-X convenience features only)
 import time
 import os
 import sys
+import threading
+import queue
+import functools
+import random
 import numpy as np
 from hardware_mock import is_raspberry_pi
+# Per-detection post-processing (uses the mypyc-compiled build when present)
+from _detections import Detection, normalize_label, convert_detections
+
+# Core the FrameGrabber capture thread is pinned to on the Pi
+CAPTURE_CORE = 0
+# OpenMP worker threads for inference on the Pi (set by the __main__ entry
+# point only), leaving a core for capture
+INFERENCE_THREADS = 3
 
 # Try to import detection libraries
 try:
     import cv2
+    # Keep cvtColor/resize single-threaded so they don't compete with inference
+    cv2.setNumThreads(1)
     OPENCV_AVAILABLE = True
 except ImportError:
     OPENCV_AVAILABLE = False
 
-try:
-    import mediapipe as mp
-    from mediapipe.tasks import python
-    from mediapipe.tasks.python import vision
-    MEDIAPIPE_AVAILABLE = True
-except ImportError:
-    MEDIAPIPE_AVAILABLE = False
+# Backends are imported on first use by the _check_* functions below, so
+# start-up never pays for importing (or failing to import) unused ones
+mp = python = vision = None
+Vilib = None
+Picamera2 = None
 
-try:
-    from vilib import Vilib
-    VILIB_AVAILABLE = True
-except ImportError:
-    VILIB_AVAILABLE = False
 
-# Try Picamera2 for Raspberry Pi
-try:
-    from picamera2 import Picamera2
-    PICAMERA2_AVAILABLE = True
-except ImportError:
-    PICAMERA2_AVAILABLE = False
+@functools.lru_cache(maxsize=None)
+def _check_mediapipe():
+    """Import MediaPipe on first call; returns True if it is available"""
+    global mp, python, vision
+    try:
+        import mediapipe as mp
+        from mediapipe.tasks import python
+        from mediapipe.tasks.python import vision
+    except ImportError:
+        return False
+    return True
 
 
-def normalize_label(label):
-    """
-    Normalize object detection labels.
-    Handles variations like "stop sign" vs "stop_sign", case differences, etc.
-    
-    Args:
-        label: Raw label string
-    
-    Returns:
-        Normalized lowercase label with spaces
-    """
-    if not label:
-        return ""
-    # Convert to lowercase, replace underscores with spaces, strip
-    normalized = label.lower().replace("_", " ").strip()
-    return normalized
+@functools.lru_cache(maxsize=None)
+def _check_vilib():
+    """Import vilib on first call; returns True if it is available"""
+    global Vilib
+    try:
+        from vilib import Vilib
+    except ImportError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def _check_picamera2():
+    """Import Picamera2 (Raspberry Pi camera) on first call; returns True if available"""
+    global Picamera2
+    try:
+        from picamera2 import Picamera2
+    except ImportError:
+        return False
+    return True
+
+# Detection pipeline: frames buffered by the capture thread. One, and the
+# oldest is dropped for a new one, so detection always sees the newest frame
+FRAME_QUEUE_SIZE = 1
+
+# Frame-difference gating: inference is skipped when the luma thumbnail moved
+# less than ~1% of pixels x 16 gray levels since the last inferred frame.
+# Cached results are never reused for longer than DETECTION_TTL seconds.
+MOTION_THUMB_SIZE = (80, 60)
+MOTION_THRESHOLD = (80 * 60 // 100) * 16
+DETECTION_TTL = 0.5
+
+# Classes that require the car to stop
+DEFAULT_STOP_CLASSES = ('person', 'stop sign')
+
+# COCO label map used by the EfficientDet-Lite models, indexed by category.index
+# ("???" marks the COCO ids with no annotations, so stop sign is 12, not 11)
+COCO_LABELS = (
+    'person', 'bicycle', 'car', 'motorcycle', 'airplane', 'bus', 'train',
+    'truck', 'boat', 'traffic light', 'fire hydrant', '???', 'stop sign',
+    'parking meter', 'bench', 'bird', 'cat', 'dog', 'horse', 'sheep', 'cow',
+    'elephant', 'bear', 'zebra', 'giraffe', '???', 'backpack', 'umbrella',
+    '???', '???', 'handbag', 'tie', 'suitcase', 'frisbee', 'skis',
+    'snowboard', 'sports ball', 'kite', 'baseball bat', 'baseball glove',
+    'skateboard', 'surfboard', 'tennis racket', 'bottle', '???',
+    'wine glass', 'cup', 'fork', 'knife', 'spoon', 'bowl', 'banana', 'apple',
+    'sandwich', 'orange', 'broccoli', 'carrot', 'hot dog', 'pizza', 'donut',
+    'cake', 'chair', 'couch', 'potted plant', 'bed', '???', 'dining table',
+    '???', '???', 'toilet', '???', 'tv', 'laptop', 'mouse', 'remote',
+    'keyboard', 'cell phone', 'microwave', 'oven', 'toaster', 'sink',
+    'refrigerator', '???', 'book', 'clock', 'vase', 'scissors', 'teddy bear',
+    'hair drier', 'toothbrush',
+)
+COCO_LABEL_IDS = {name: i for i, name in enumerate(COCO_LABELS) if name != '???'}
+
+
+# Frame rate MockDetector.get_frame() simulates
+MOCK_CAMERA_FPS = 30
+
+# Blank frame shared by every MockDetector.get_frame() call (read-only)
+_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+_FRAME.flags.writeable = False
 
 
 class MockDetector:
@@ -71,37 +129,39 @@ class MockDetector:
     
     def __init__(self):
         self.detection_count = 0
+        self._rng = random.Random()
     
     def detect_objects(self, frame=None):
         """Mock detection - returns simulated detections"""
         self.detection_count += 1
         
-        # Simulate occasional detections
-        import random
+        # Simulate occasional detections (labels already normalized, like real backends)
         detections = []
         
         # 10% chance of detecting a person
-        if random.random() < 0.1:
-            detections.append({
-                'class': 'person',
-                'confidence': 0.85,
-                'bbox': (100, 100, 200, 300)  # (x, y, width, height)
-            })
+        if self._rng.random() < 0.1:
+            detections.append(Detection(
+                cls='person',
+                confidence=0.85,
+                bbox=(100, 100, 200, 300)  # (x, y, width, height)
+            ))
         
         # 5% chance of detecting stop sign (use correct COCO label)
-        if random.random() < 0.05:
-            detections.append({
-                'class': 'stop sign',  # COCO uses "stop sign" with space
-                'confidence': 0.90,
-                'bbox': (300, 150, 100, 100)
-            })
+        if self._rng.random() < 0.05:
+            detections.append(Detection(
+                cls='stop sign',  # COCO uses "stop sign" with space
+                confidence=0.90,
+                bbox=(300, 150, 100, 100)
+            ))
         
         return detections
     
     def get_frame(self):
-        """Get mock frame (numpy array)"""
-        # Return a dummy image array
-        return np.zeros((480, 640, 3), dtype=np.uint8)
+        """Get mock frame (numpy array, shared and read-only)"""
+        # Paced like a real camera, so a capture thread doesn't spin
+        time.sleep(1.0 / MOCK_CAMERA_FPS)
+        # Return the preallocated dummy image rather than allocating per frame
+        return _FRAME
     
     def cleanup(self):
         """Clean up resources"""
@@ -114,7 +174,8 @@ class MediaPipeDetector:
     Primary backend - works on both PC and Raspberry Pi 5.
     """
     
-    def __init__(self, model_path=None, camera_index=0, use_picamera2=None):
+    def __init__(self, model_path=None, camera_index=0, use_picamera2=None,
+                 lores_size=(320, 240)):
         """
         Initialize MediaPipe detector.
         
@@ -122,8 +183,10 @@ class MediaPipeDetector:
             model_path: Path to .tflite model file (e.g., efficientdet_lite0.tflite)
             camera_index: Camera index for OpenCV (PC) or None for auto-select
             use_picamera2: Force Picamera2 on Pi (None = auto-detect)
+            lores_size: (width, height) of the Picamera2 low-res stream used for
+                inference, scaled by the ISP. None runs inference on the main stream.
         """
-        if not MEDIAPIPE_AVAILABLE:
+        if not _check_mediapipe():
             raise ImportError("MediaPipe not available. Install: pip install mediapipe")
         
         if not OPENCV_AVAILABLE:
@@ -131,10 +194,15 @@ class MediaPipeDetector:
         
         # Determine model path
         if model_path is None:
-            # Try common locations
+            # Try common locations, preferring the int8-quantized variants
+            # (~2-3x faster on the Pi's CPU, <=1% mAP loss)
             possible_paths = [
+                'models/efficientdet_lite0_int8.tflite',
+                'efficientdet_lite0_int8.tflite',
                 'models/efficientdet_lite0.tflite',
                 'efficientdet_lite0.tflite',
+                'models/efficientdet_lite1_int8.tflite',
+                'efficientdet_lite1_int8.tflite',
                 'models/efficientdet_lite1.tflite',
                 'efficientdet_lite1.tflite',
             ]
@@ -154,15 +222,56 @@ class MediaPipeDetector:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
         
+        # Latest detections from the LIVE_STREAM callback (set on MediaPipe's thread)
+        self._latest_detections = []
+        self._result_lock = threading.Lock()
+        # Completed inferences (result callbacks), for measuring real FPS
+        self.inference_count = 0
+        self._last_timestamp_ms = -1
+        
+        # Reused BGR -> RGB conversion buffer (allocated on first frame)
+        self._rgb_buf = None
+        self._lores_rgb_buf = None
+        self._capture_buf = None
+        
+        # Luma thumbnail of the last frame sent to inference (frame-difference gate)
+        self._prev_luma = None
+        self._last_inference_ts = 0.0
+        
+        # Main stream size; boxes are always reported in these coordinates
+        self._main_size = (640, 480)
+        self._lores_size = None
+        
         # Initialize MediaPipe object detector
-        base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.ObjectDetectorOptions(
-            base_options=base_options,
-            score_threshold=0.5,
-            max_results=5,
-            running_mode=vision.RunningMode.IMAGE,
-        )
-        self.detector = vision.ObjectDetector.create_from_options(options)
+        # LIVE_STREAM runs inference on MediaPipe's worker thread, so capturing the
+        # next frame overlaps with inference on the current one
+        on_pi = is_raspberry_pi()
+        
+        # Prefer the GPU delegate on the Pi; the CPU delegate already runs XNNPACK
+        # kernels, so it is the fallback when the GPU one can't be created
+        delegates = [python.BaseOptions.Delegate.CPU]
+        if on_pi:
+            delegates.insert(0, python.BaseOptions.Delegate.GPU)
+        
+        self.detector = None
+        for delegate in delegates:
+            base_options = python.BaseOptions(model_asset_path=model_path, delegate=delegate)
+            options = vision.ObjectDetectorOptions(
+                base_options=base_options,
+                score_threshold=0.5,
+                max_results=5,
+                running_mode=vision.RunningMode.LIVE_STREAM,
+                result_callback=self._on_result,
+            )
+            try:
+                self.detector = vision.ObjectDetector.create_from_options(options)
+            except Exception as e:
+                if delegate == delegates[-1]:
+                    raise
+                print(f"[WARNING] {delegate.name} delegate unavailable: {e}")
+                continue
+            print(f"[INFO] MediaPipe using {delegate.name} delegate")
+            break
         
         # Initialize camera
         self.camera = None
@@ -171,18 +280,30 @@ class MediaPipeDetector:
         
         # Auto-detect camera backend
         if use_picamera2 is None:
-            self.use_picamera2 = is_raspberry_pi() and PICAMERA2_AVAILABLE
+            self.use_picamera2 = on_pi and _check_picamera2()
         
         if self.use_picamera2:
             try:
+                if not _check_picamera2():
+                    raise ImportError("picamera2 not available")
                 self.camera = Picamera2()
                 # Configure for object detection (lower resolution for speed)
-                config = self.camera.create_preview_configuration(
-                    main={"size": (640, 480)}
-                )
+                # "RGB888" is laid out [B, G, R] in memory, i.e. already OpenCV's BGR
+                # The lores stream is downscaled by the ISP, so inference frames
+                # cost no CPU resize (lores must be YUV420 on the Pi)
+                streams = {"main": {"size": self._main_size, "format": "RGB888"}}
+                if lores_size is not None:
+                    streams["lores"] = {"size": tuple(lores_size), "format": "YUV420"}
+                # Two buffers: capture_array() always sees a fresh frame rather than
+                # one that queued up while inference was running
+                config = self.camera.create_preview_configuration(buffer_count=2, **streams)
                 self.camera.configure(config)
                 self.camera.start()
+                if lores_size is not None:
+                    self._lores_size = tuple(lores_size)
                 print("[INFO] Using Picamera2 for camera capture")
+                if self._lores_size is not None:
+                    print(f"[INFO] Inference on {self._lores_size[0]}x{self._lores_size[1]} lores stream")
             except Exception as e:
                 print(f"[WARNING] Picamera2 initialization failed: {e}")
                 print("[INFO] Falling back to OpenCV")
@@ -193,6 +314,14 @@ class MediaPipeDetector:
             self.camera = cv2.VideoCapture(camera_index)
             if not self.camera.isOpened():
                 raise RuntimeError(f"Could not open camera {camera_index}")
+            # Keep only the newest frame queued (V4L2 defaults to ~4, so read()
+            # would return frames that are several inference cycles old)
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # MJPG at a fixed size avoids the driver's YUYV -> BGR conversion
+            # on USB webcams; backends that don't support these ignore them
+            self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self._main_size[0])
+            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self._main_size[1])
             print(f"[INFO] Using OpenCV for camera capture (index {camera_index})")
         
         print(f"[INFO] MediaPipe detector initialized with model: {model_path}")
@@ -207,10 +336,8 @@ class MediaPipeDetector:
         if self.use_picamera2:
             # Picamera2 capture
             try:
-                frame = self.camera.capture_array()
-                # Picamera2 returns RGB, convert to BGR for OpenCV compatibility
-                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                return frame_bgr
+                # Configured as RGB888, which is already BGR - no conversion needed
+                return self.camera.capture_array()
             except Exception as e:
                 print(f"[ERROR] Picamera2 capture failed: {e}")
                 return None
@@ -221,57 +348,154 @@ class MediaPipeDetector:
                 return frame
             return None
     
+    def get_lores_frame(self):
+        """
+        Get current frame from the Picamera2 lores stream.
+        
+        Returns:
+            numpy array (RGB format, lores_size) or None if unavailable
+        """
+        if self._lores_size is None:
+            return None
+        try:
+            yuv = self.camera.capture_array("lores")
+        except Exception as e:
+            print(f"[ERROR] Picamera2 lores capture failed: {e}")
+            return None
+        
+        # I420 planes -> packed RGB into a reused buffer
+        w, h = self._lores_size
+        if self._lores_rgb_buf is None:
+            self._lores_rgb_buf = np.empty((h, w, 3), dtype=np.uint8)
+        return cv2.cvtColor(yuv, cv2.COLOR_YUV2RGB_I420, dst=self._lores_rgb_buf)
+    
+    def _on_result(self, detection_result, output_image, timestamp_ms):
+        """LIVE_STREAM result callback (runs on MediaPipe's worker thread)"""
+        # Scale boxes from lores frames back to main stream coordinates
+        sx = sy = 1.0
+        if self._lores_size is not None:
+            sx = self._main_size[0] / output_image.width
+            sy = self._main_size[1] / output_image.height
+        
+        # Convert to our format with normalized labels. Integer ids for
+        # should_stop are only kept when they agree with the label, so a model
+        # with a different label map uses the string path
+        detections = convert_detections(detection_result.detections, sx, sy, COCO_LABEL_IDS)
+        
+        with self._result_lock:
+            self._latest_detections = detections
+            self.inference_count += 1
+    
     def detect_objects(self, frame=None):
         """
         Detect objects in frame.
         
+        The frame is submitted for asynchronous inference, and the detections
+        from the most recently completed inference are returned, so results
+        can lag the given frame by a frame or two.
+        
         Args:
-            frame: numpy array image (BGR format). If None, captures from camera.
+            frame: numpy array image (BGR format). If None, captures from camera
+                (the ISP-scaled lores stream on Picamera2).
         
         Returns:
-            List of detection dictionaries with normalized labels
+            List of Detection objects with normalized labels
+            (bboxes in main stream / get_frame() coordinates)
         """
         # Get frame if not provided
         if frame is None:
-            frame = self.get_frame()
-            if frame is None:
-                return []
+            return self.capture_and_detect()
+        
+        return self._submit(self._to_rgb(frame))
+    
+    def capture_and_detect(self):
+        """
+        Capture a frame and submit it for detection in one step.
         
-        # Resize for speed (optional, but recommended for Pi)
-        # Keep original size for better accuracy, or resize for speed
-        # frame = cv2.resize(frame, (320, 240))  # Uncomment for faster processing
+        The captured frame never leaves this method: the lores stream is used
+        as-is on Picamera2, and OpenCV reads into a reused buffer.
         
-        # Convert BGR to RGB
-        if len(frame.shape) == 3 and frame.shape[2] == 3:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        Returns:
+            List of Detection objects (see detect_objects)
+        """
+        if self._lores_size is not None:
+            # Already RGB and already model-sized - no CPU resize or swap
+            frame_rgb = self.get_lores_frame()
+            if frame_rgb is None:
+                return []
+            return self._submit(frame_rgb)
+        
+        if self.use_picamera2:
+            frame = self.get_frame()
         else:
-            frame_rgb = frame
+            ret, frame = self.camera.read(self._capture_buf)
+            if ret:
+                self._capture_buf = frame
+            else:
+                frame = None
+        if frame is None:
+            return []
+        
+        return self._submit(self._to_rgb(frame))
+    
+    def _to_rgb(self, frame):
+        """Convert BGR to RGB into a reused buffer (mp.Image copies it, so reuse is safe)"""
+        if len(frame.shape) != 3 or frame.shape[2] != 3:
+            return frame
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty_like(frame)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+    
+    def detect_objects_batch(self, frames):
+        """
+        Convenience wrapper: detect_objects() on each frame in turn.
+        
+        Not a throughput path. In LIVE_STREAM mode MediaPipe drops frames
+        submitted while the graph is busy, so frames submitted back to back
+        mostly get the same latest results. Submit only the newest frame
+        instead (see FrameGrabber).
+        
+        Args:
+            frames: List of numpy array images (BGR format)
+        
+        Returns:
+            List of detection lists, one per frame
+        """
+        return [self.detect_objects(frame) for frame in frames]
+    
+    def _submit(self, frame_rgb):
+        """Submit an RGB frame for async detection and return the latest results"""
+        # Static scene: reuse the cached detections instead of running inference
+        now = time.monotonic()
+        thumb = cv2.resize(frame_rgb, MOTION_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_RGB2GRAY)
+        if (self._prev_luma is not None
+                and now - self._last_inference_ts < DETECTION_TTL
+                and cv2.absdiff(self._prev_luma, thumb).sum() < MOTION_THRESHOLD):
+            with self._result_lock:
+                return self._latest_detections
+        self._prev_luma = thumb
+        self._last_inference_ts = now
         
         # Create MediaPipe image
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=frame_rgb)
         
-        # Detect objects
-        detection_result = self.detector.detect(mp_image)
-        
-        # Convert to our format with normalized labels
-        detections = []
-        for detection in detection_result.detections:
-            bbox = detection.bounding_box
-            category = detection.categories[0]
-            
-            # Normalize label (handles "stop sign" vs "stop_sign", etc.)
-            label = normalize_label(category.category_name)
-            
-            detections.append({
-                'class': label,
-                'confidence': category.score,
-                'bbox': (bbox.origin_x, bbox.origin_y, bbox.width, bbox.height)
-            })
+        # Submit for detection (timestamps must strictly increase)
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        self.detector.detect_async(mp_image, timestamp_ms)
         
-        return detections
+        with self._result_lock:
+            return self._latest_detections
     
     def cleanup(self):
         """Clean up resources"""
+        try:
+            self.detector.close()
+        except:
+            pass
+        
         if self.use_picamera2 and self.camera:
             try:
                 self.camera.stop()
@@ -294,7 +518,7 @@ class VilibDetector:
     """
     
     def __init__(self):
-        if not VILIB_AVAILABLE:
+        if not _check_vilib():
             raise ImportError("vilib not available. Install vilib for PiCar-X.")
         
         # Start camera
@@ -316,23 +540,23 @@ class VilibDetector:
         For stop signs and general objects, use MediaPipe.
         
         Returns:
-            List of detection dictionaries
+            List of Detection objects
         """
         detections = []
         
         # Check for face (vilib's "human" is actually face detection)
         if Vilib.detect_obj_parameter.get('human_n', 0) != 0:
-            detections.append({
-                'class': 'person',  # Map face to person for compatibility
-                'confidence': 0.8,  # vilib doesn't provide confidence
-                'bbox': (
+            detections.append(Detection(
+                cls='person',  # Map face to person for compatibility
+                confidence=0.8,  # vilib doesn't provide confidence
+                bbox=(
                     Vilib.detect_obj_parameter.get('human_x', 0),
                     Vilib.detect_obj_parameter.get('human_y', 0),
                     Vilib.detect_obj_parameter.get('human_w', 0),
                     Vilib.detect_obj_parameter.get('human_h', 0)
                 ),
-                'note': 'face_detection'  # Indicate this is face, not full person
-            })
+                note='face_detection'  # Indicate this is face, not full person
+            ))
         
         # vilib does not provide general object detection (stop signs, etc.)
         # Use MediaPipe for that
@@ -359,7 +583,8 @@ class ObjectDetector:
     Secondary: vilib (face detection only, PiCar-X convenience)
     """
     
-    def __init__(self, method='auto', model_path=None, camera_index=0):
+    def __init__(self, method='auto', model_path=None, camera_index=0,
+                 stop_classes=DEFAULT_STOP_CLASSES):
         """
         Initialize detector.
         
@@ -367,16 +592,21 @@ class ObjectDetector:
             method: 'auto', 'mediapipe', 'vilib', or 'mock'
             model_path: Path to .tflite model (for MediaPipe)
             camera_index: Camera index for OpenCV (PC)
+            stop_classes: Class names that require stopping
         """
         self.method = method
+        # Backends emit normalized labels, so should_stop is a set lookup
+        self._stop_set = frozenset(normalize_label(c) for c in stop_classes)
+        self._stop_ids = frozenset(COCO_LABEL_IDS[c] for c in self._stop_set
+                                   if c in COCO_LABEL_IDS)
         self.detector = None
         self.detection_backend = None
         
         if method == 'auto':
             # Auto-select: prefer MediaPipe (most capable)
-            if MEDIAPIPE_AVAILABLE:
+            if _check_mediapipe():
                 method = 'mediapipe'
-            elif is_raspberry_pi() and VILIB_AVAILABLE:
+            elif is_raspberry_pi() and _check_vilib():
                 method = 'vilib'
             else:
                 method = 'mock'
@@ -408,6 +638,12 @@ class ObjectDetector:
             self.detector = MockDetector()
             self.detection_backend = 'mock'
             print("[INFO] Using mock detector (PC development mode)")
+        
+        # Fused capture + inference, bound straight to the backend so the
+        # per-frame call skips this wrapper. Backends without one capture
+        # inside detect_objects() when given no frame.
+        self.capture_and_detect = getattr(self.detector, 'capture_and_detect',
+                                          self.detector.detect_objects)
     
     def detect_objects(self, frame=None):
         """
@@ -417,10 +653,27 @@ class ObjectDetector:
             frame: Optional image frame. If None, captures from camera.
         
         Returns:
-            List of detection dictionaries with normalized labels
+            List of Detection objects with normalized labels
         """
         return self.detector.detect_objects(frame)
     
+    def detect_objects_batch(self, frames):
+        """
+        Convenience wrapper: detect objects in each of several frames.
+        Not faster than calling detect_objects() per frame (see
+        MediaPipeDetector.detect_objects_batch).
+        
+        Args:
+            frames: List of image frames
+        
+        Returns:
+            List of detection lists, one per frame
+        """
+        detect_batch = getattr(self.detector, 'detect_objects_batch', None)
+        if detect_batch is not None:
+            return detect_batch(frames)
+        return [self.detector.detect_objects(frame) for frame in frames]
+    
     def should_stop(self, detections=None, stop_classes=None):
         """
         Check if car should stop based on detections.
@@ -428,27 +681,38 @@ class ObjectDetector:
         Args:
             detections: List of detections (if None, will detect)
             stop_classes: List of class names that require stopping.
-                         Default: ['person', 'stop sign']
+                         Default: the stop_classes given at construction
         
         Returns:
             (should_stop: bool, detected_class: str or None)
         """
         if stop_classes is None:
-            stop_classes = ['person', 'stop sign']
+            stop_set = self._stop_set
+            stop_ids = self._stop_ids
+        else:
+            stop_set = frozenset(normalize_label(c) for c in stop_classes)
+            stop_ids = frozenset(COCO_LABEL_IDS[c] for c in stop_set if c in COCO_LABEL_IDS)
         
         if detections is None:
             detections = self.detect_objects()
         
-        # Normalize stop classes for comparison
-        stop_classes_normalized = [normalize_label(c) for c in stop_classes]
-        
+        # Integer COCO id when the backend provides one (MediaPipe), otherwise
+        # the label, which the backends already normalize
         for detection in detections:
-            detected_class = normalize_label(detection['class'])
-            if detected_class in stop_classes_normalized:
-                return True, detected_class
+            class_id = detection.class_id
+            if class_id is not None:
+                if class_id in stop_ids:
+                    return True, detection.cls
+            elif detection.cls in stop_set:
+                return True, detection.cls
         
         return False, None
     
+    @property
+    def inference_count(self):
+        """Completed inferences, or None if the backend doesn't report them"""
+        return getattr(self.detector, 'inference_count', None)
+    
     def get_frame(self):
         """Get current camera frame"""
         return self.detector.get_frame()
@@ -459,6 +723,219 @@ class ObjectDetector:
             self.detector.cleanup()
 
 
+class FrameGrabber:
+    """
+    Background capture thread feeding a small frame queue.
+    Producer half of the detection pipeline: the next frame is captured
+    while the consumer converts and runs inference on the current one.
+    When the queue is full the oldest frame is dropped, so the consumer
+    never works on (or displays) a stale frame.
+    """
+    
+    def __init__(self, detector, maxsize=FRAME_QUEUE_SIZE, pin_core=None):
+        """
+        Args:
+            detector: Anything with a get_frame() method
+            maxsize: Maximum number of frames buffered
+            pin_core: CPU core to pin the capture thread to (Linux only), or
+                None to leave it unpinned. Only this thread is pinned: the
+                rest of the process keeps every core for inference.
+        """
+        self.detector = detector
+        self.pin_core = pin_core
+        self.frames = queue.Queue(maxsize=maxsize)
+        self._running = False
+        self._thread = None
+    
+    def start(self):
+        """Start the capture thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def _run(self):
+        # On Linux pid 0 is the calling thread, so this pins the capture thread only
+        if self.pin_core is not None and hasattr(os, 'sched_setaffinity'):
+            try:
+                os.sched_setaffinity(0, {self.pin_core})
+                print(f"[INFO] Capture thread pinned to core {self.pin_core}")
+            except OSError as e:
+                print(f"[WARNING] Could not set CPU affinity: {e}")
+        
+        while self._running:
+            frame = self.detector.get_frame()
+            if frame is None:
+                time.sleep(0.1)
+                continue
+            
+            try:
+                self.frames.put_nowait(frame)
+            except queue.Full:
+                # Drop the oldest frame (this is the only producer, so the retry fits)
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+                self.frames.put_nowait(frame)
+    
+    def get_latest(self, timeout=1.0):
+        """
+        Get the newest captured frame, discarding any older ones still queued.
+        
+        Args:
+            timeout: Seconds to wait for a frame
+        
+        Returns:
+            Frame, or None if none arrived within timeout
+        """
+        try:
+            frame = self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        
+        while True:
+            try:
+                frame = self.frames.get_nowait()
+            except queue.Empty:
+                return frame
+    
+    def stop(self):
+        """Stop the capture thread"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+class DetectionWorker:
+    """
+    Detection thread for test_object_detection_with_viewer.
+    Runs inference, the stop logic and status printing off the main thread,
+    which is left to the viewer window: HighGUI (imshow/waitKey) is only
+    supported on the main thread on macOS and with the Qt backend.
+    
+    With a FrameGrabber, each result is published with its frame through a
+    one-slot queue (the newest replaces any not yet shown); without one,
+    frames are captured inside the detector and nothing is published.
+    """
+    
+    def __init__(self, detector, override, grabber=None):
+        """
+        Args:
+            detector: ObjectDetector
+            override: VisionOverride updated from each result
+            grabber: FrameGrabber supplying frames for display, or None
+        """
+        self.detector = detector
+        self.override = override
+        self.grabber = grabber
+        self.results = queue.Queue(maxsize=1)
+        self.frame_count = 0
+        self.fps = 0.0
+        self._running = False
+        self._thread = None
+    
+    def start(self):
+        """Start the detection thread"""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def is_alive(self):
+        """True while the detection thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _publish(self, item):
+        """Hand a result to the viewer, replacing any result not yet shown"""
+        try:
+            self.results.put_nowait(item)
+        except queue.Full:
+            # Drop the stale result (this is the only producer, so the retry fits)
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                pass
+            self.results.put_nowait(item)
+    
+    def _run(self):
+        detector = self.detector
+        override = self.override
+        grabber = self.grabber
+        
+        # FPS tracking: completed inferences per second, measured over ~1 s
+        # windows (backends without an inference count fall back to loop frames)
+        fps_start = time.monotonic()
+        fps_count_start = 0
+        
+        while self._running:
+            if grabber is not None:
+                # Newest captured frame only (older ones are dropped)
+                frame = grabber.get_latest(timeout=0.5)
+                if frame is None:
+                    print("[WARNING] Could not get frame, skipping...")
+                    continue
+                detections = detector.detect_objects(frame)
+            else:
+                # Fused capture + detect
+                frame = None
+                detections = detector.capture_and_detect()
+            
+            # Check for critical objects in a single pass.
+            # Labels are already normalized by the backends
+            person_present = False
+            stop_sign_present = False
+            for d in detections:
+                cls = d.cls
+                if cls == 'person':
+                    person_present = True
+                elif cls == 'stop sign':
+                    stop_sign_present = True
+            
+            # Update override
+            override.update(person_present, stop_sign_present, time.time())
+            
+            prev_count = self.frame_count
+            self.frame_count += 1
+            frame_count = self.frame_count
+            
+            # Calculate FPS from completed inferences, not submitted frames
+            now = time.monotonic()
+            if now - fps_start >= 1.0:
+                count = detector.inference_count
+                if count is None:
+                    count = frame_count
+                self.fps = (count - fps_count_start) / (now - fps_start)
+                fps_start = now
+                fps_count_start = count
+            
+            # Print status every 10 frames
+            if frame_count // 10 > prev_count // 10:
+                print(f"Frame {frame_count}: {len(detections)} objects, FPS: {self.fps:.1f}")
+                if detections:
+                    for det in detections:
+                        print(f"  - {det.cls} ({det.confidence:.2f})")
+                if override.should_stop():
+                    print("  >>> STOP REQUIRED <<<")
+            
+            if grabber is not None:
+                self._publish((frame, detections, self.fps, override.get_status()))
+            else:
+                # No viewer, just print occasionally
+                if frame_count // 30 > prev_count // 30:
+                    print(f"Frame {frame_count}: {len(detections)} objects detected")
+                
+                time.sleep(0.1)  # Small delay when no viewer
+    
+    def stop(self):
+        """Stop the detection thread"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+
 class VisionOverride:
     """
     Vision override state for integration with mapping/routing.
@@ -514,72 +991,118 @@ class VisionOverride:
         }
 
 
+# Overlay fonts (0 is cv2.FONT_HERSHEY_SIMPLEX; a literal so this needs no cv2)
+FONT = 0
+LABEL_FONT_SCALE = 0.5
+LABEL_THICKNESS = 1
+STATUS_FONT_SCALE = 0.7
+STATUS_THICKNESS = 2
+WHITE = (255, 255, 255)
+
+
+@functools.lru_cache(maxsize=512)
+def _label_patch(label, conf_text, color):
+    """
+    Render a detection label box once per (label, confidence text, color).
+    
+    Args:
+        label: Class label
+        conf_text: Confidence exactly as displayed (f"{confidence:.2f}"), so
+            the cache key can't round differently from the rendered text
+        color: BGR background color
+    
+    Returns:
+        (patch, text, text_width, text_height) - patch is the filled box with
+        the text drawn in, as it would appear with its top-left at
+        (x, label_y - text_height - 5)
+    """
+    text = f"{label} {conf_text}"
+    (tw, th), _ = cv2.getTextSize(text, FONT, LABEL_FONT_SCALE, LABEL_THICKNESS)
+    patch = np.empty((th + 11, tw + 1, 3), dtype=np.uint8)
+    patch[:] = color
+    cv2.putText(patch, text, (0, th + 5), FONT, LABEL_FONT_SCALE, WHITE, LABEL_THICKNESS)
+    patch.flags.writeable = False
+    return patch, text, tw, th
+
+
 def visualize_detections(frame, detections, fps=0.0, override_status=None):
     """
     Draw detections on frame for visualization.
     
+    Draws in place - captured frames are discarded after display, so there
+    is no need to copy. A cv2.UMat is also accepted, to keep drawing on the
+    OpenCL T-API path.
+    
     Args:
-        frame: Image frame (BGR format)
-        detections: List of detection dictionaries
+        frame: Image frame (BGR format), modified in place unless read-only
+        detections: List of Detection objects
         fps: Current FPS
         override_status: VisionOverride status dict (optional)
     
     Returns:
-        Annotated frame
+        The annotated frame (the input itself, or a copy if it was read-only)
     """
-    if not OPENCV_AVAILABLE:
-        return frame
+    # No OPENCV_AVAILABLE check: only viewer code calls this, and it requires OpenCV
     
-    annotated = frame.copy()
+    # Shared read-only frames (e.g. the mock frame) can't be drawn on in place
+    if isinstance(frame, np.ndarray) and not frame.flags.writeable:
+        frame = frame.copy()
     
     # Draw FPS
-    cv2.putText(annotated, f"FPS: {fps:.1f}", (10, 25),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    cv2.putText(frame, f"FPS: {fps:.1f}", (10, 25),
+                FONT, STATUS_FONT_SCALE, WHITE, STATUS_THICKNESS)
+    
+    # Label boxes are blitted from cached patches where they fit (numpy frames)
+    blit = isinstance(frame, np.ndarray)
+    if blit:
+        frame_h, frame_w = frame.shape[:2]
     
     # Draw detections
     for det in detections:
-        x, y, w, h = det['bbox']
-        label = det['class']
-        confidence = det['confidence']
+        x, y, w, h = det.bbox
+        label = det.cls
+        confidence = det.confidence
         
         # Color based on class
-        if 'person' in label:
+        if label == 'person':
             color = (0, 0, 255)  # Red for person
-        elif 'stop sign' in label:
+        elif label == 'stop sign':
             color = (0, 165, 255)  # Orange for stop sign
         else:
             color = (0, 255, 0)  # Green for others
         
         # Draw bounding box
-        cv2.rectangle(annotated, (x, y), (x + w, y + h), color, 2)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
         
         # Draw label and confidence
-        label_text = f"{label} {confidence:.2f}"
-        label_size, _ = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-        label_y = max(y, label_size[1] + 10)
+        patch, label_text, tw, th = _label_patch(label, f"{confidence:.2f}", color)
+        label_y = max(y, th + 10)
+        top = label_y - th - 5
         
-        # Background for text
-        cv2.rectangle(annotated, (x, label_y - label_size[1] - 5),
-                     (x + label_size[0], label_y + 5), color, -1)
-        cv2.putText(annotated, label_text, (x, label_y),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        if blit and x >= 0 and x + tw < frame_w and top + th + 11 <= frame_h:
+            frame[top:top + th + 11, x:x + tw + 1] = patch
+        else:
+            # Clipped at the frame edge (or a UMat): draw it directly
+            cv2.rectangle(frame, (x, top), (x + tw, label_y + 5), color, -1)
+            cv2.putText(frame, label_text, (x, label_y),
+                        FONT, LABEL_FONT_SCALE, WHITE, LABEL_THICKNESS)
     
     # Draw override status
     if override_status:
         y_offset = 50
         if override_status.get('person_present'):
-            cv2.putText(annotated, "PERSON DETECTED - STOP!", (10, y_offset),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            cv2.putText(frame, "PERSON DETECTED - STOP!", (10, y_offset),
+                       FONT, STATUS_FONT_SCALE, (0, 0, 255), STATUS_THICKNESS)
             y_offset += 30
         if override_status.get('stop_sign_present'):
-            cv2.putText(annotated, "STOP SIGN - STOP!", (10, y_offset),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+            cv2.putText(frame, "STOP SIGN - STOP!", (10, y_offset),
+                       FONT, STATUS_FONT_SCALE, (0, 165, 255), STATUS_THICKNESS)
             y_offset += 30
         if override_status.get('should_stop'):
-            cv2.putText(annotated, ">>> STOPPING <<<", (10, y_offset),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 3)
+            cv2.putText(frame, ">>> STOPPING <<<", (10, y_offset),
+                       FONT, 0.8, (0, 0, 255), 3)
     
-    return annotated
+    return frame
 
 
 def test_object_detection_with_viewer(show_viewer=True):
@@ -609,80 +1132,48 @@ def test_object_detection_with_viewer(show_viewer=True):
     # Create override for integration demo
     override = VisionOverride()
     
-    # FPS tracking
-    last_time = time.time()
-    fps = 0.0
-    frame_count = 0
+    # With a viewer, capture runs on its own thread and detection on another,
+    # and this (main) thread only draws: HighGUI must stay on the main thread.
+    # Headless, frames are never needed outside the detector
+    capture_core = CAPTURE_CORE if is_raspberry_pi() else None
+    grabber = FrameGrabber(detector, pin_core=capture_core).start() if show_viewer else None
+    worker = DetectionWorker(detector, override, grabber).start()
+    window_name = "Object Detection"
     
     try:
-        while True:
-            frame_start = time.time()
-            
-            # Get frame
-            frame = detector.get_frame()
-            if frame is None:
-                print("[WARNING] Could not get frame, skipping...")
+        while worker.is_alive():
+            if not show_viewer:
                 time.sleep(0.1)
                 continue
             
-            # Detect objects
-            detections = detector.detect_objects(frame)
-            
-            # Check for critical objects
-            person_present = any('person' in normalize_label(d['class']) for d in detections)
-            stop_sign_present = any('stop sign' in normalize_label(d['class']) for d in detections)
-            
-            # Update override
-            override.update(person_present, stop_sign_present, time.time())
-            
-            # Calculate FPS
-            frame_time = time.time() - frame_start
-            if frame_time > 0:
-                current_fps = 1.0 / frame_time
-                fps = 0.9 * fps + 0.1 * current_fps  # Exponential moving average
-            
-            frame_count += 1
-            
-            # Print status every 10 frames
-            if frame_count % 10 == 0:
-                print(f"Frame {frame_count}: {len(detections)} objects, FPS: {fps:.1f}")
-                if detections:
-                    for det in detections:
-                        print(f"  - {det['class']} ({det['confidence']:.2f})")
-                if override.should_stop():
-                    print("  >>> STOP REQUIRED <<<")
+            try:
+                frame, detections, fps, override_status = worker.results.get(timeout=0.05)
+                annotated = visualize_detections(frame, detections, fps, override_status)
+                cv2.imshow(window_name, annotated)
+            except queue.Empty:
+                pass
             
-            # Visualize
-            if show_viewer:
-                annotated = visualize_detections(
-                    frame, detections, fps, override.get_status()
-                )
-                cv2.imshow("Object Detection", annotated)
-                
-                # Check for quit
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    print("\nQuitting (q pressed)...")
-                    break
-            else:
-                # No viewer, just print occasionally
-                if frame_count % 30 == 0:
-                    print(f"Frame {frame_count}: {len(detections)} objects detected")
-                
-                time.sleep(0.1)  # Small delay when no viewer
+            # Pump GUI events even when no new frame arrived
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                print("\nQuitting (q pressed)...")
+                break
     
     except KeyboardInterrupt:
         print("\nInterrupted by user")
     
     finally:
-        # Cleanup
+        # Cleanup (detection first: it consumes the grabber's frames)
+        worker.stop()
+        if grabber is not None:
+            grabber.stop()
         if show_viewer:
             cv2.destroyAllWindows()
         detector.cleanup()
         
         print("\n" + "=" * 60)
         print("Object detection test complete!")
-        print(f"Total frames processed: {frame_count}")
-        print(f"Average FPS: {fps:.1f}")
+        print(f"Total frames processed: {worker.frame_count}")
+        print(f"Average FPS: {worker.fps:.1f}")
         print("=" * 60)
 
 
@@ -706,7 +1197,7 @@ def test_object_detection():
         if detections:
             print(f"  Frame {i+1}: Detected {len(detections)} object(s)")
             for det in detections:
-                print(f"    - {det['class']} (confidence: {det['confidence']:.2f})")
+                print(f"    - {det.cls} (confidence: {det.confidence:.2f})")
         else:
             print(f"  Frame {i+1}: No objects detected")
         
@@ -715,8 +1206,8 @@ def test_object_detection():
     # Test stop logic
     print("\nTesting stop logic...")
     detections = [
-        {'class': 'person', 'confidence': 0.9, 'bbox': (100, 100, 50, 100)},
-        {'class': 'stop sign', 'confidence': 0.7, 'bbox': (200, 150, 30, 50)}
+        Detection('person', 0.9, (100, 100, 50, 100)),
+        Detection('stop sign', 0.7, (200, 150, 30, 50))
     ]
     
     should_stop, detected_class = detector.should_stop(detections)
@@ -744,6 +1235,12 @@ def test_object_detection():
 if __name__ == "__main__":
     import argparse
     
+    # Cap OpenMP inference threads on the Pi, leaving a core for capture.
+    # numpy is already loaded by now; this reaches MediaPipe/TFLite, which
+    # are only imported when the detector is created
+    if is_raspberry_pi():
+        os.environ.setdefault('OMP_NUM_THREADS', str(INFERENCE_THREADS))
+    
     parser = argparse.ArgumentParser(description='Object Detection Test')
     parser.add_argument('--viewer', action='store_true', 
                        help='Show viewer window with detections')
@@ -10,7 +10,7 @@ This implements the requirements from project.md:
 import time
 import random
 import sys
-from hardware_mock import get_hardware
+from hardware_mock import get_hardware, UltrasonicPoller
 
 # Configuration
 OBSTACLE_THRESHOLD = 20  # cm - stop when object is this close
@@ -18,7 +18,7 @@ BACKUP_TIME = 1.0       # seconds to back up
 TURN_TIME = 0.5         # seconds to turn
 FORWARD_POWER = 30      # Power level for forward movement
 TURN_POWER = 30         # Power level for turning
-CHECK_INTERVAL = 0.1    # seconds between distance checks
+CHECK_INTERVAL = 0.02   # seconds between distance checks
 
 def obstacle_avoidance_loop(hw, run_time=60):
     """
@@ -34,26 +34,36 @@ def obstacle_avoidance_loop(hw, run_time=60):
     print(f"Obstacle threshold: {OBSTACLE_THRESHOLD} cm")
     print(f"Press Ctrl+C to stop\n")
     
-    start_time = time.time()
-    us = hw['ultrasonic']
+    # Monotonic clock: wall-clock jumps (NTP sync on the Pi) can't skew timing
+    start_time = time.monotonic()
+    next_tick = start_time
+    # Background pings ~60 ms apart (hardware_mock.POLL_INTERVAL): the HC-SR04
+    # needs that long for late echoes to die out, while CHECK_INTERVAL keeps the
+    # control loop itself responsive
+    poller = UltrasonicPoller(hw['ultrasonic']).start()
+    # Trigger time of the last sample acted on, and when the last maneuver ended
+    last_taken = float('-inf')
+    maneuver_end = float('-inf')
     
     try:
         while True:
+            next_tick += CHECK_INTERVAL
+            
             # Check if we should stop based on run_time
-            if run_time and (time.time() - start_time) > run_time:
+            if run_time and (time.monotonic() - start_time) > run_time:
                 print("\nRun time completed. Stopping...")
                 break
             
-            # Check distance ahead
-            if hasattr(us, 'get_distance'):
-                distance = us.get_distance()
-            else:
-                distance = us.read()
+            # Check distance ahead (latest background reading, never blocks)
+            taken_at, distance = poller.get_latest()
             
-            print(f"Distance: {distance} cm", end='\r')
+            # Only act on a fresh ping, and never on one triggered before the
+            # last maneuver finished (it measured where the car used to point)
+            if taken_at <= max(last_taken, maneuver_end):
+                pass  # Nothing new yet - keep the current motor command
             
-            # Check if obstacle detected
-            if distance < OBSTACLE_THRESHOLD:
+            elif distance < OBSTACLE_THRESHOLD:
+                last_taken = taken_at
                 print(f"\n[OBSTACLE] Detected at {distance} cm!")
                 
                 # Stop immediately
@@ -69,7 +79,7 @@ def obstacle_avoidance_loop(hw, run_time=60):
                 time.sleep(0.2)
                 
                 # Choose random direction
-                direction = random.choice(['left', 'right'])
+                direction = 'left' if random.getrandbits(1) else 'right'
                 print(f"  → Turning {direction}...")
                 
                 if direction == 'left':
@@ -80,21 +90,30 @@ def obstacle_avoidance_loop(hw, run_time=60):
                 time.sleep(TURN_TIME)
                 hw['stop']()
                 time.sleep(0.2)
+                maneuver_end = time.monotonic()
                 
                 print("  → Continuing forward...\n")
             
             # Move forward if no obstacle
             else:
+                last_taken = taken_at
+                print(f"Distance: {distance} cm", end='\r')
                 hw['forward'](FORWARD_POWER)
             
-            # Small delay between checks
-            time.sleep(CHECK_INTERVAL)
+            # Sleep until the next check, so sensor read time doesn't add to the period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind (e.g. after a maneuver) - restart the schedule
+                next_tick = time.monotonic()
     
     except KeyboardInterrupt:
         print("\n\nStopped by user")
     finally:
         # Always stop motors when exiting
         hw['stop']()
+        poller.stop()
         print("\nMotors stopped. Safe to exit.")
 
 def main():
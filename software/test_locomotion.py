@@ -11,16 +11,109 @@ Based on the lab requirements, this tests:
 
 import time
 import sys
-from hardware_mock import get_hardware, get_picar_components
+from random import getrandbits
+import numpy as np
+from hardware_mock import get_hardware, get_picar_components, UltrasonicPoller
+
+# Samples older than this (seconds) are stale and waited on instead of used
+MAX_SAMPLE_AGE = 0.15
+
+# Servo scan plan, fixed, so it is computed once at import.
+# Settle time per step is proportional to the move, assuming an SG90-class
+# servo slewing ~60 deg per 0.1 s (600 deg/s), with a 20 ms floor: the first
+# move from center to -90 gets 150 ms, each 15 deg step 25 ms.
+SERVO_SPEED = 600.0  # degrees/second
+SCAN_ANGLES = (-90, -75, -60, -45, -30, -15, 0, 15, 30, 45, 60, 75, 90)  # Every 15 degrees
+_SCAN_ANGLE_ARRAY = np.array(SCAN_ANGLES, dtype=np.int16)  # int16 view for callers/CSV
+_SCAN_ANGLE_ARRAY.setflags(write=False)
+SCAN_SETTLE = np.maximum(np.abs(np.diff(_SCAN_ANGLE_ARRAY, prepend=0)) / SERVO_SPEED, 0.02).astype(np.float32)
+SCAN_SETTLE.setflags(write=False)
+_SCAN_PLAN = tuple(zip(SCAN_ANGLES, SCAN_SETTLE.tolist()))
+
+def run_for(action_on, action_off, duration):
+    """
+    Run action_on, then action_off once duration seconds have passed.
+    
+    Timed against a monotonic deadline taken just before action_on, slept
+    in short slices, so the stop lands on the deadline instead of drifting
+    with sleep overshoot or wall-clock adjustments.
+    
+    Args:
+        action_on: Callable to start (or None to just wait)
+        action_off: Callable to run at the deadline (or None)
+        duration: Seconds between the two
+    """
+    sleep, monotonic = time.sleep, time.monotonic  # Locals: no global/attribute lookup per slice
+    deadline = monotonic() + duration
+    if action_on is not None:
+        action_on()
+    while True:
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            break
+        sleep(min(0.01, remaining))
+    if action_off is not None:
+        action_off()
+
+def _sample(us, n, sample_wait=0.06, out=None):
+    """
+    Take n paced ultrasonic readings in a row.
+    
+    The one blocking sampling loop in this file; the scan and avoidance tests
+    read from an UltrasonicPoller instead because they move in between.
+    
+    Args:
+        us: Ultrasonic sensor (with get_distance() or read())
+        n: Number of readings
+        sample_wait: Minimum seconds between pings (HC-SR04 needs ~60 ms)
+        out: Optional float32 array (length >= n) to fill instead of allocating
+    
+    Returns:
+        float32 array of the n distances in cm
+    """
+    out = np.empty(n, dtype=np.float32) if out is None else out
+    # get_distance() matches the picar-4wd API; read() fallback for mock compatibility
+    read_distance = getattr(us, 'get_distance', None) or us.read
+    sleep, monotonic = time.sleep, time.monotonic
+    t_last = monotonic() - sample_wait
+    for i in range(n):
+        # Wait only what is left of sample_wait since the previous ping
+        remaining = sample_wait - (monotonic() - t_last)
+        if remaining > 0:
+            sleep(remaining)
+        out[i] = read_distance()
+        t_last = monotonic()
+    return out[:n]
+
+def wait_for_sample(get_latest, since, timeout=1.0):
+    """
+    Return the first poller distance whose ping was triggered at or after since.
+    
+    Args:
+        get_latest: UltrasonicPoller.get_latest
+        since: Monotonic time the sample must not predate
+        timeout: Seconds to wait before giving up
+    
+    Returns:
+        Distance in cm
+    """
+    sleep, monotonic = time.sleep, time.monotonic
+    deadline = monotonic() + timeout
+    while True:
+        taken_at, distance = get_latest()
+        if taken_at >= since:
+            return distance
+        if monotonic() > deadline:
+            raise RuntimeError("No fresh ultrasonic sample (poller thread stopped?)")
+        sleep(0.005)
 
 def test_forward_movement(hw, duration=2):
     """Test forward movement"""
     print("\n=== Testing Forward Movement ===")
     print(f"Moving forward for {duration} seconds...")
     
-    hw['forward'](50)  # 50% power - matches picar-4wd API
-    time.sleep(duration)
-    hw['stop']()
+    forward = hw['forward']
+    run_for(lambda: forward(50), hw['stop'], duration)  # 50% power - matches picar-4wd API
     
     print("Forward movement test complete!\n")
 
@@ -29,111 +122,165 @@ def test_servo_movement(hw):
     print("\n=== Testing Servo Movement ===")
     
     angles = [0, 45, 90, -45, -90, 0]
+    set_angle = hw['servo'].set_angle
+    sleep = time.sleep
     for angle in angles:
         print(f"Setting servo to {angle} degrees")
-        hw['servo'].set_angle(angle)
-        time.sleep(0.5)
+        set_angle(angle)
+        sleep(0.5)
     
     print("Servo movement test complete!\n")
 
-def test_ultrasonic_sensor(hw, num_readings=5):
-    """Test ultrasonic sensor readings"""
+def test_ultrasonic_sensor(hw, num_readings=5, sample_wait=0.06):
+    """
+    Test ultrasonic sensor readings
+    
+    Reports the median rather than the mean: a single timeout or multipath
+    echo would drag a mean off, while the median of a few samples ignores it.
+    
+    Args:
+        hw: Hardware interface from get_hardware()
+        num_readings: Number of samples (odd, so the median is one sample)
+        sample_wait: Seconds between pings (HC-SR04 needs ~60 ms between triggers)
+    
+    Returns:
+        float32 array of distance samples in cm, in the order they were read
+    """
     print("\n=== Testing Ultrasonic Sensor ===")
     
-    distances = []
-    us = hw['ultrasonic']
-    for i in range(num_readings):
-        # Use get_distance() which matches picar-4wd API
-        if hasattr(us, 'get_distance'):
-            distance = us.get_distance()
-        else:
-            distance = us.read()  # Fallback for mock compatibility
-        distances.append(distance)
-        time.sleep(0.2)
+    distances = _sample(hw['ultrasonic'], num_readings, sample_wait)
     
-    avg_distance = sum(distances) / len(distances)
-    print(f"Average distance: {avg_distance:.2f} cm")
+    median_distance = np.partition(distances, num_readings // 2)[num_readings // 2]
+    print(f"Median distance: {median_distance:.2f} cm")
     print("Ultrasonic sensor test complete!\n")
     return distances
 
-def test_obstacle_avoidance(hw):
-    """Test basic obstacle avoidance logic (as described in Step 4 of Part 1)"""
+def test_obstacle_avoidance(hw, sample_wait=0.06):
+    """
+    Test basic obstacle avoidance logic (as described in Step 4 of Part 1)
+    
+    Args:
+        hw: Hardware interface from get_hardware()
+        sample_wait: Seconds between background pings (HC-SR04 needs ~60 ms)
+    """
     print("\n=== Testing Obstacle Avoidance Logic ===")
     print("This simulates the Roomba-like behavior from the lab requirements.")
     
     obstacle_threshold = 20  # cm - stop when object is this close
     us = hw['ultrasonic']
     
-    for i in range(5):
-        # Use get_distance() which matches picar-4wd API
-        if hasattr(us, 'get_distance'):
-            distance = us.get_distance()
-        else:
-            distance = us.read()  # Fallback for mock compatibility
-        
-        if distance < obstacle_threshold:
-            print(f"[WARNING] Obstacle detected at {distance} cm! Stopping...")
-            hw['stop']()
-            time.sleep(0.5)
+    # Sensor is read on a background thread; motor calls are resolved once
+    poller = UltrasonicPoller(us, sample_wait).start()
+    forward = hw['forward']
+    stop = hw['stop']
+    backward = hw.get('backward')
+    turn_left, turn_right = hw.get('turn_left'), hw.get('turn_right')
+    # Capability checks done once: None means "just wait" to run_for
+    back_up = (lambda: backward(30)) if backward else None
+    # Indexed by getrandbits(1): (direction, start action)
+    turns = (
+        ('right', (lambda: turn_right(30)) if turn_right else None),
+        ('left', (lambda: turn_left(30)) if turn_left else None),
+    )
+    monotonic = time.monotonic
+    lines = []  # Written once after the loop so stdout stays out of the ping timing
+    log = lines.append
+    
+    try:
+        for i in range(5):
+            # Latest reading, unless it is stale (e.g. taken before a turn)
+            distance = wait_for_sample(poller.get_latest, monotonic() - MAX_SAMPLE_AGE)
             
-            print("Backing up...")
-            if 'backward' in hw:
-                hw['backward'](30)
+            if distance < obstacle_threshold:
+                log(f"[WARNING] Obstacle detected at {distance} cm! Stopping...")
+                run_for(stop, None, 0.5)
+                
+                log("Backing up...")
+                if back_up is None:
+                    log("[MOCK] Would back up here")
+                run_for(back_up, stop, 0.5)
+                
+                log("Choosing new direction and turning...")
+                # Simulate choosing a random direction
+                direction, start_turn = turns[getrandbits(1)]
+                log(f"Turning {direction}...")
+                run_for(start_turn, stop, 0.5)
             else:
-                print("[MOCK] Would back up here")
-            time.sleep(0.5)
-            hw['stop']()
-            
-            print("Choosing new direction and turning...")
-            # Simulate choosing a random direction
-            import random
-            direction = random.choice(['left', 'right'])
-            print(f"Turning {direction}...")
-            if direction == 'left' and 'turn_left' in hw:
-                hw['turn_left'](30)
-            elif direction == 'right' and 'turn_right' in hw:
-                hw['turn_right'](30)
-            time.sleep(0.5)
-            hw['stop']()
-        else:
-            print(f"[OK] Clear path ({distance} cm). Moving forward...")
-            hw['forward'](30)
-            time.sleep(0.3)
-            hw['stop']()
-        
-        time.sleep(0.2)
+                log(f"[OK] Clear path ({distance} cm). Moving forward...")
+                run_for(lambda: forward(30), stop, 0.3)
+    finally:
+        poller.stop()
     
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
     print("Obstacle avoidance test complete!\n")
 
-def test_servo_scan(hw):
-    """Test scanning environment with servo-mounted ultrasonic (for mapping)"""
+def test_servo_scan(hw, sample_wait=0.06):
+    """
+    Test scanning environment with servo-mounted ultrasonic (for mapping)
+    
+    Args:
+        hw: Hardware interface from get_hardware()
+        sample_wait: Seconds between background pings (HC-SR04 needs ~60 ms)
+    
+    Returns:
+        (angles, distances) - int16 angles in degrees (read-only, in
+        SCAN_ANGLES order) and float32 distances in cm, ready for vectorized
+        mapping code (polar -> Cartesian, argmin, ...)
+    """
     print("\n=== Testing Servo Scanning (for mapping) ===")
     print("This simulates the scanning behavior needed for Step 4 mapping.")
     
-    # Scan from -90 to +90 degrees
-    angles = range(-90, 91, 15)  # Every 15 degrees
-    distances = []
+    # Scan from -90 to +90 degrees (SCAN_ANGLES, precomputed)
+    distances = np.empty(len(SCAN_ANGLES), dtype=np.float32)
     
     servo = hw['servo']
-    us = hw['ultrasonic']
+    set_angle = servo.set_angle
+    sleep, monotonic = time.sleep, time.monotonic
+    lines = []  # Printed in one write after the scan, keeping stdout out of the timing
+    format_line = "  Angle {0}°: {1:.1f} cm".format  # Template parsed once, not per line
     
-    for angle in angles:
-        servo.set_angle(angle)
-        time.sleep(0.1)  # Wait for servo to move
-        # Use get_distance() which matches picar-4wd API
-        if hasattr(us, 'get_distance'):
-            distance = us.get_distance()
-        else:
-            distance = us.read()  # Fallback for mock compatibility
-        distances.append((angle, distance))
-        print(f"  Angle {angle}°: {distance} cm")
+    # The sensor is pinged continuously on a background thread. The servo
+    # starts toward the next angle as soon as a sample is accepted, and only
+    # a sample whose ping was triggered after the servo settled is used, so
+    # the scan never waits on an echo it could not use.
+    poller = UltrasonicPoller(hw['ultrasonic'], sample_wait).start()
+    plan = _SCAN_PLAN
+    last = len(plan) - 1
+    try:
+        set_angle(plan[0][0])
+        settled_at = monotonic() + plan[0][1]
+        for i, (angle, _) in enumerate(plan):
+            remaining = settled_at - monotonic()
+            if remaining > 0:
+                sleep(remaining)  # Wait for servo to move
+            distance = wait_for_sample(poller.get_latest, settled_at)
+            
+            if i < last:
+                next_angle, settle_time = plan[i + 1]
+                set_angle(next_angle)
+                settled_at = monotonic() + settle_time
+            
+            distances[i] = distance
+            lines.append(format_line(angle, distance))
+    finally:
+        poller.stop()
     
     # Return to center
     servo.set_angle(0)
+    sys.stdout.write('\n'.join(lines) + '\n')
+    
+    # Then the same scan for the mapping step: one "angle,distance" row per
+    # step between # SCAN_BEGIN / # SCAN_END, written by NumPy in one call;
+    # np.loadtxt(..., delimiter=',') reads it back as an (N, 2) array (the
+    # # lines are skipped as comments)
+    np.savetxt(sys.stdout, np.column_stack((_SCAN_ANGLE_ARRAY, distances)), fmt=('%d', '%.1f'),
+               delimiter=',', header='SCAN_BEGIN', footer='SCAN_END')
+    sys.stdout.flush()
     
-    print(f"\nScan complete. Found {len([d for _, d in distances if d < 30])} obstacles within 30cm")
+    print(f"\nScan complete. Found {int((distances < 30).sum())} obstacles within 30cm")
     print("Servo scanning test complete!\n")
-    return distances
+    return _SCAN_ANGLE_ARRAY, distances
 
 def main():
     """Main test function"""
@@ -171,10 +318,11 @@ def main():
             print("\n[WARNING] REAL HARDWARE DETECTED [WARNING]")
             response = input("Test actual forward movement? (y/n): ")
             if response.lower() == 'y':
-                duration = input("Duration in seconds (default 2): ")
-                try:
-                    duration = float(duration) if duration else 2.0
-                except:
+                duration = input("Duration in seconds (default 2): ").strip()
+                # Validate before converting rather than catching float() errors
+                if duration and duration.replace('.', '', 1).isdigit():
+                    duration = float(duration)
+                else:
                     duration = 2.0
                 test_forward_movement(hw, duration=duration)
         else:
@@ -192,12 +340,18 @@ def main():
         
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
-        hw['forward'].stop()
         sys.exit(0)
-    except Exception as e:
+    except (OSError, RuntimeError, ValueError) as e:
+        # Hardware/GPIO failures; anything else is a bug and should surface with a traceback
         print(f"\n\nError during testing: {e}")
-        hw['forward'].stop()
         sys.exit(1)
+    finally:
+        # Stop the motors on every exit path (including the sys.exit() calls above).
+        # hw['forward'] is a plain function, so the stop lives in hw['stop'].
+        try:
+            hw['stop']()
+        except Exception as e:
+            print(f"[WARNING] Could not stop motors: {e}")
 
 if __name__ == "__main__":
     main()